@@ -6,17 +6,80 @@ Default log directory:
   ~/.openclaw/logs/router-decisions/
 Files:
   router-decisions-YYYY-MM-DD.jsonl
+  router-decisions-YYYY-MM-DD.jsonl.gz / .jsonl.zst   (closed days, see `compact`)
+  router-decisions-YYYY-MM-DD.cols/                   (columnar archive, `compact --columnar`)
+
+Unfiltered runs cache a per-day partial summary in <log-dir>/.summary-cache/,
+so past days are never re-parsed and today's file is read from where the
+previous run stopped.
+--session queries go through a session index in <log-dir>/.session-index/
+(byte offsets of each session's lines, kept up to date the same way) and
+add the session's request timeline to the report.
+
+`ingest` loads new lines into <log-dir>/router-decisions.sqlite3 (indexed on
+ts, sessionKey, finalModel and taskType); `--db` runs the report as SQL
+against it instead of reading the logs.
+
+`export` tails today's log and serves running request, latency-histogram and
+tool-gate counters at http://127.0.0.1:9465/metrics for Prometheus scrapes.
+
+  analyze-router-decisions.py --days 30
+  analyze-router-decisions.py --since 2026-10-18T09:30 --until 2026-10-18T10:00
+  analyze-router-decisions.py --days 7 --compare-to previous
+  analyze-router-decisions.py --group-by finalModel,taskType --metrics 'count,p95(responseTimeMs),rate(toolGateEscalated)'
+  analyze-router-decisions.py --days 7 --bucket 1h --bucket-by-model --csv > hourly.csv
+  analyze-router-decisions.py --days 1 --concurrency
+  analyze-router-decisions.py --days 1 --slowest 20
+  analyze-router-decisions.py compact --format zst --columnar
+  analyze-router-decisions.py ingest && analyze-router-decisions.py --db ~/.openclaw/logs/router-decisions/router-decisions.sqlite3
+  analyze-router-decisions.py export --port 9465
 """
 
 from __future__ import annotations
 
 import argparse
+import array
+import bisect
+import csv
+import gzip
+import heapq
+import io
 import json
+import math
 import os
-from collections import Counter, defaultdict
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
+
+try:
+    import msgspec
+except ImportError:  # optional: typed fast decode path
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # optional: fast decode path
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:  # optional: vectorized columnar aggregation
+    np = None
+
+try:
+    import zstandard
+except ImportError:  # optional: .jsonl.zst archives
+    zstandard = None
 
 
 def parse_args() -> argparse.Namespace:
@@ -24,44 +87,410 @@ def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Analyze router decision JSONL logs.")
     p.add_argument("--log-dir", type=Path, default=default_dir, help="Directory with router-decisions-YYYY-MM-DD.jsonl files.")
     p.add_argument("--days", type=int, default=7, help="Lookback window in days (default: 7).")
+    p.add_argument("--since", type=str, default="", help="Window start: ISO time, epoch ms, or a duration ago (30m, 2h). Overrides --days.")
+    p.add_argument("--until", type=str, default="", help="Window end (exclusive), same forms as --since (default: now).")
     p.add_argument("--session", type=str, default="", help="Filter to a single session key.")
     p.add_argument("--model", type=str, default="", help="Filter to entries where finalModel contains this substring.")
     p.add_argument("--json", action="store_true", help="Emit JSON instead of Markdown.")
-    return p.parse_args()
+    p.add_argument("--cache-dir", type=Path, default=None, help="Per-day summary cache directory (default: <log-dir>/.summary-cache).")
+    p.add_argument("--no-cache", action="store_true", help="Re-parse every day file instead of using the summary cache.")
+    p.add_argument("--workers", type=int, default=1, help="Parse day files / byte ranges in N processes (default: 1).")
+    p.add_argument("--no-columnar", action="store_true", help="Ignore columnar archives and parse the JSONL day files.")
+    p.add_argument("--db", type=Path, default=None, help="Run the summary as SQL against a database built by `ingest`.")
+    p.add_argument("--index-dir", type=Path, default=None, help="Session index directory (default: <log-dir>/.session-index).")
+    p.add_argument("--no-index", action="store_true", help="Scan the raw logs for --session instead of using the session index.")
+    p.add_argument("--follow", action="store_true", help="Tail today's log and print rolling 5m/1h stats until interrupted.")
+    p.add_argument("--interval", type=float, default=5.0, help="Seconds between --follow refreshes (default: 5).")
+    p.add_argument("--bucket", type=str, default="", help="Add a time series with buckets of this size, e.g. 5m, 1h, 1d.")
+    p.add_argument("--bucket-by-model", action="store_true", help="Split the --bucket series per finalModel.")
+    p.add_argument("--gate-overhead", action="store_true", help="Estimate the latency cost of tool-gate retries and escalations.")
+    p.add_argument("--concurrency", action="store_true", help="Rebuild in-flight request counts per model and per minute.")
+    p.add_argument(
+        "--slowest",
+        type=int,
+        default=0,
+        help="List the N slowest chat completions and flag per-model latency outliers (robust z-score).",
+    )
+    p.add_argument("--csv", action="store_true", help="With --bucket or --group-by, print only that table as CSV.")
+    p.add_argument("--group-by", type=str, default="", help="Query mode: comma-separated fields to group by, e.g. finalModel,taskType.")
+    p.add_argument(
+        "--metrics",
+        type=str,
+        default="count",
+        help="Query metrics: count, sum(f), avg(f), min(f), max(f), pNN(f), rate(f) (default: count).",
+    )
+    p.add_argument(
+        "--where",
+        action="append",
+        default=[],
+        help="Query filter on any field: f=v, f!=v, f~substring, f>n, f>=n, f<n, f<=n (repeatable).",
+    )
+    p.add_argument("--max-groups", type=int, default=10000, help="Query groups kept before the rest fold into '(other)'.")
+    p.add_argument(
+        "--compare-to",
+        type=str,
+        default="",
+        help="Report deltas against a baseline window: 'previous' (same length, just before) or START..END.",
+    )
+    p.add_argument(
+        "--decoder",
+        choices=["auto", *DECODERS],
+        default="auto",
+        help="JSON decoder: msgspec/orjson when installed, else stdlib json (default: auto).",
+    )
+
+    sub = p.add_subparsers(dest="command", metavar="command")
+    c = sub.add_parser("compact", help="Compress closed day files into .jsonl.gz or .jsonl.zst.")
+    c.add_argument("--log-dir", type=Path, default=argparse.SUPPRESS, help="Directory with router decision logs.")
+    c.add_argument("--format", choices=["gz", "zst"], default="gz", help="Archive format (default: gz).")
+    c.add_argument("--level", type=int, default=None, help="Compression level (default: gzip 6, zstd 10).")
+    c.add_argument("--keep-days", type=int, default=1, help="Leave the newest N days as plain JSONL (default: 1, today).")
+    c.add_argument("--columnar", action="store_true", help="Also build a columnar archive for every closed day.")
+    x = sub.add_parser("export", help="Serve live router metrics for Prometheus/OpenMetrics scrapes.")
+    x.add_argument("--log-dir", type=Path, default=argparse.SUPPRESS, help="Directory with router decision logs.")
+    x.add_argument("--bind", type=str, default="127.0.0.1", help="Address to listen on (default: 127.0.0.1).")
+    x.add_argument("--port", type=int, default=9465, help="Port to listen on (default: 9465).")
+    x.add_argument("--from-end", action="store_true", help="Count only lines appended after start-up, not today's file so far.")
+    i = sub.add_parser("ingest", help="Load new log lines into a SQLite database (see --db).")
+    i.add_argument("--log-dir", type=Path, default=argparse.SUPPRESS, help="Directory with router decision logs.")
+    i.add_argument("--db", type=Path, default=argparse.SUPPRESS, help="Database path (default: <log-dir>/router-decisions.sqlite3).")
+
+    args = p.parse_args()
+    if args.bucket:
+        try:
+            args.bucket_ms = parse_duration(args.bucket) * 1000
+        except ValueError as exc:
+            p.error(f"--bucket: {exc}")
+    else:
+        args.bucket_ms = 0
+    if args.csv and not (args.bucket or args.group_by):
+        p.error("--csv needs --bucket or --group-by")
+    args.query = None
+    if args.group_by or args.where:
+        try:
+            args.query = GroupQuery(
+                [f.strip() for f in args.group_by.split(",") if f.strip()],
+                parse_metrics(args.metrics),
+                [parse_where(w) for w in args.where],
+                args.max_groups,
+            )
+        except ValueError as exc:
+            p.error(str(exc))
+    try:
+        args.since_ms = parse_time(args.since) if args.since else None
+        args.until_ms = parse_time(args.until) if args.until else None
+    except ValueError as exc:
+        p.error(str(exc))
+    if args.until_ms is not None and args.since_ms is None:
+        p.error("--until needs --since")
+    if args.since_ms is not None and args.until_ms is not None and args.until_ms <= args.since_ms:
+        p.error("--until must be after --since")
+    if args.compare_to and args.compare_to != "previous":
+        start, sep, end = args.compare_to.partition("..")
+        try:
+            if not sep:
+                raise ValueError(f"--compare-to: expected 'previous' or START..END, got {args.compare_to!r}")
+            args.compare_range = (parse_time(start), parse_time(end))
+        except ValueError as exc:
+            p.error(str(exc))
+        if args.compare_range[1] <= args.compare_range[0]:
+            p.error("--compare-to: END must be after START")
+    if args.db is not None and args.command != "ingest":
+        unsupported = [
+            flag for flag, on in (
+                ("--bucket", args.bucket), ("--gate-overhead", args.gate_overhead),
+                ("--concurrency", args.concurrency), ("--slowest", args.slowest),
+                ("--group-by/--where", args.query is not None), ("--follow", args.follow),
+            ) if on
+        ]
+        if unsupported:
+            p.error(f"--db does not support {', '.join(unsupported)}")
+        if not args.db.exists():
+            p.error(f"--db {args.db} does not exist (run `ingest` first)")
+    if args.command == "compact" and args.format == "zst" and zstandard is None:
+        p.error("compact --format zst needs the zstandard package")
+    if args.decoder != "auto" and DECODERS[args.decoder] is None:
+        p.error(f"--decoder {args.decoder} is not installed")
+    return args
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
 
+def parse_duration(text: str) -> int:
+    """Parse '30s', '5m', '1h', '1d' into seconds."""
+    raw = text.strip().lower()
+    if len(raw) < 2 or raw[-1] not in DURATION_UNITS or not raw[:-1].isdigit() or int(raw[:-1]) <= 0:
+        raise ValueError(f"invalid duration {text!r} (expected e.g. 30s, 5m, 1h, 1d)")
+    return int(raw[:-1]) * DURATION_UNITS[raw[-1]]
 
-def days_in_window(days: int) -> list[str]:
+
+def parse_time(text: str) -> int:
+    """Parse an ISO 8601 time (UTC when no offset), epoch ms/s, or a duration ago into epoch ms."""
+    raw = text.strip()
+    if raw.isdigit():
+        n = int(raw)
+        return n if n >= 10**11 else n * 1000
+    try:
+        return int(time.time() * 1000) - parse_duration(raw) * 1000
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"invalid time {text!r} (expected ISO time, epoch ms, or e.g. 30m)") from None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def format_ms(ms: float) -> str:
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def days_in_range(since_ms: int, until_ms: int | None) -> list[str]:
+    """
+    UTC days touched by [since_ms, until_ms), newest first like
+    days_in_window(); the proxy files each record under the UTC day of its ts.
+    """
+    first = datetime.fromtimestamp(since_ms / 1000, timezone.utc).date()
+    end_ms = until_ms - 1 if until_ms is not None else int(time.time() * 1000)
+    last = datetime.fromtimestamp(max(since_ms, end_ms) / 1000, timezone.utc).date()
+    return [(last - timedelta(days=i)).isoformat() for i in range((last - first).days + 1)]
+
+
+def days_in_window(days: int, offset: int = 0) -> list[str]:
+    """The last `days` UTC days, newest first, ending `offset` days before today."""
     now = datetime.now(timezone.utc).date()
-    return [(now - timedelta(days=i)).isoformat() for i in range(max(1, days))]
+    return [(now - timedelta(days=offset + i)).isoformat() for i in range(max(1, days))]
 
 
-def load_entries(log_dir: Path, days: int) -> list[dict[str, Any]]:
-    entries: list[dict[str, Any]] = []
-    for day in days_in_window(days):
-        p = log_dir / f"router-decisions-{day}.jsonl"
+# Plain JSONL wins when a day has both forms: it is either not compacted yet
+# or a leftover from an interrupted compaction, and complete either way.
+DAY_FILE_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+
+
+def day_file(log_dir: Path, day: str) -> Path | None:
+    for suffix in DAY_FILE_SUFFIXES:
+        p = log_dir / f"router-decisions-{day}{suffix}"
         if not p.exists():
             continue
-        for line in p.read_text(encoding="utf-8", errors="ignore").splitlines():
-            raw = line.strip()
-            if not raw:
-                continue
-            try:
-                rec = json.loads(raw)
-                if isinstance(rec, dict):
-                    entries.append(rec)
-            except json.JSONDecodeError:
-                continue
-    return entries
+        if suffix == ".jsonl.zst" and zstandard is None:
+            print(f"warning: skipping {p.name} (zstandard not installed)", file=sys.stderr)
+            continue
+        return p
+    return None
 
 
-def apply_filters(entries: list[dict[str, Any]], session: str, model: str) -> list[dict[str, Any]]:
-    out = entries
-    if session:
-        out = [e for e in out if str(e.get("sessionKey", "")) == session]
-    if model:
-        needle = model.lower()
-        out = [e for e in out if needle in str(e.get("finalModel", "")).lower()]
-    return out
+def iter_day_files(log_dir: Path, days: int) -> Iterator[Path]:
+    for day in days_in_window(days):
+        p = day_file(log_dir, day)
+        if p is not None:
+            yield p
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix in (".gz", ".zst")
+
+
+def open_day_file(path: Path) -> BinaryIO:
+    """Open a day file for binary line iteration, decompressing as a stream."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        reader = zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+        return io.BufferedReader(reader)
+    return path.open("rb")
+
+
+# ── Record decoding ──────────────────────────────────────────
+#
+# A decoder maps one stripped JSONL line to a dict, or None when the line is
+# not a JSON object. The fast decoders fall back to decode_stdlib for any
+# line they reject, so every decoder keeps exactly the same records.
+
+def decode_stdlib(raw: bytes) -> dict[str, Any] | None:
+    try:
+        rec = json.loads(raw.decode("utf-8", errors="ignore"))
+    except json.JSONDecodeError:
+        return None
+    return rec if isinstance(rec, dict) else None
+
+
+if orjson is not None:
+    def decode_orjson(raw: bytes) -> dict[str, Any] | None:
+        try:
+            rec = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return decode_stdlib(raw)
+        return rec if isinstance(rec, dict) else None
+else:
+    decode_orjson = None
+
+
+if msgspec is not None:
+    _Unset = msgspec.UnsetType
+
+    class RouterDecision(msgspec.Struct, gc=False):
+        """
+        The fields RouterSummary reads with default options. Every other key
+        is dropped, so only the cached plain-summary path may use this.
+        """
+
+        ts: int | float | None | _Unset = msgspec.UNSET
+        event: str | None | _Unset = msgspec.UNSET
+        sessionKey: str | None | _Unset = msgspec.UNSET
+        taskType: str | None | _Unset = msgspec.UNSET
+        selectedModel: str | None | _Unset = msgspec.UNSET
+        finalModel: str | None | _Unset = msgspec.UNSET
+        modelSource: str | None | _Unset = msgspec.UNSET
+        toolGateActive: bool | None | _Unset = msgspec.UNSET
+        toolGateRetryCount: int | float | None | _Unset = msgspec.UNSET
+        toolGateEscalated: bool | None | _Unset = msgspec.UNSET
+        toolGateHadValidToolCalls: bool | None | _Unset = msgspec.UNSET
+        responseTimeMs: int | float | None | _Unset = msgspec.UNSET
+
+    _router_decision_decoder = msgspec.json.Decoder(RouterDecision)
+    _record_decoder = msgspec.json.Decoder()
+
+    def decode_msgspec(raw: bytes) -> dict[str, Any] | None:
+        try:
+            rec = _record_decoder.decode(raw)
+        except msgspec.DecodeError:
+            return decode_stdlib(raw)
+        return rec if isinstance(rec, dict) else None
+
+    def decode_msgspec_summary(raw: bytes) -> dict[str, Any] | None:
+        try:
+            # to_builtins drops UNSET fields, so absent keys stay absent.
+            return msgspec.to_builtins(_router_decision_decoder.decode(raw))
+        except msgspec.DecodeError:
+            return decode_stdlib(raw)
+else:
+    decode_msgspec = None
+    decode_msgspec_summary = None
+
+
+DECODERS: dict[str, Callable[[bytes], dict[str, Any] | None] | None] = {
+    "msgspec": decode_msgspec,
+    "orjson": decode_orjson,
+    "json": decode_stdlib,
+}
+
+
+def get_decoder(name: str = "auto", summary_only: bool = False) -> Callable[[bytes], dict[str, Any] | None]:
+    """
+    Decoders return whole records. With summary_only (a plain RouterSummary
+    with default options and no filters) msgspec may decode into the
+    RouterDecision struct instead, which skips every other field.
+    """
+    if summary_only and name in ("auto", "msgspec") and decode_msgspec_summary is not None:
+        return decode_msgspec_summary
+    if name == "auto":
+        return decode_msgspec or decode_orjson or decode_stdlib
+    decode = DECODERS.get(name)
+    if decode is None:
+        raise ValueError(f"decoder not available: {name}")
+    return decode
+
+
+def iter_records(
+    lines: Iterable[bytes],
+    decode: Callable[[bytes], dict[str, Any] | None] = decode_stdlib,
+    prefilter: Callable[[bytes], bool] | None = None,
+) -> Iterator[dict[str, Any]]:
+    for line in lines:
+        raw = line.strip()
+        if not raw or (prefilter is not None and not prefilter(raw)):
+            continue
+        rec = decode(raw)
+        if rec is not None:
+            yield rec
+
+
+# ── Byte-level prefilter ─────────────────────────────────────
+#
+# --session and --model are checked against the raw line before decoding.
+# The prefilter may only drop lines that provably cannot match; apply_filters
+# still confirms every decoded record. A JSON string value appears in the
+# line as its escaped text, which for the keys and model ids the proxy
+# writes is the value itself.
+
+_JSON_LITERAL_TEXT = ("none", "true", "false")
+
+
+def make_line_prefilter(session: str, model: str) -> Callable[[bytes], bool] | None:
+    checks: list[Callable[[bytes], bool]] = []
+
+    # str(None) / str(True) would match a null or boolean that the bytes spell differently.
+    if session and session.lower() not in _JSON_LITERAL_TEXT:
+        encoded = {
+            json.dumps(session, ensure_ascii=False)[1:-1].encode("utf-8"),
+            json.dumps(session)[1:-1].encode("ascii"),
+        }
+        if len(encoded) == 1:
+            needle = encoded.pop()
+            checks.append(lambda raw: needle in raw)
+        else:
+            needles = tuple(encoded)
+            checks.append(lambda raw: any(n in raw for n in needles))
+
+    lowered = model.lower()
+    if model and not any(lowered in lit for lit in _JSON_LITERAL_TEXT):
+        model_needle = json.dumps(lowered, ensure_ascii=False)[1:-1].encode("utf-8")
+
+        def model_check(raw: bytes) -> bool:
+            # bytes.lower() only folds ASCII, and a \uXXXX escape can hide a
+            # character whose lower() is ASCII, so only plain ASCII lines are
+            # safe to reject.
+            if not raw.isascii() or b"\\u" in raw:
+                return True
+            return model_needle in raw.lower()
+
+        checks.append(model_check)
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    return lambda raw: all(check(raw) for check in checks)
+
+
+def load_entries(
+    log_dir: Path,
+    days: int,
+    decoder: str = "auto",
+    prefilter: Callable[[bytes], bool] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield decoded records lazily, one day file at a time."""
+    decode = get_decoder(decoder)
+    for p in iter_day_files(log_dir, days):
+        with open_day_file(p) as f:
+            yield from iter_records(f, decode, prefilter)
+
+
+def apply_filters(entries: Iterable[dict[str, Any]], session: str, model: str) -> Iterator[dict[str, Any]]:
+    needle = model.lower()
+    for e in entries:
+        if session and str(e.get("sessionKey", "")) != session:
+            continue
+        if model and needle not in str(e.get("finalModel", "")).lower():
+            continue
+        yield e
+
+
+def apply_time_range(
+    entries: Iterable[dict[str, Any]],
+    since_ms: int | None,
+    until_ms: int | None,
+) -> Iterator[dict[str, Any]]:
+    """Keep records with since_ms <= ts < until_ms; records without a numeric ts are dropped."""
+    lo = -math.inf if since_ms is None else since_ms
+    hi = math.inf if until_ms is None else until_ms
+    for e in entries:
+        ts = safe_num(e.get("ts"))
+        if ts is not None and lo <= ts < hi:
+            yield e
 
 
 def safe_num(v: Any) -> float | None:
@@ -72,77 +501,2873 @@ def safe_num(v: Any) -> float | None:
         return None
 
 
-def summarize(entries: list[dict[str, Any]], days: int, session: str, model: str) -> dict[str, Any]:
-    chat_entries = [e for e in entries if e.get("event") == "chat_completion"]
-    total = len(entries)
-    chat_total = len(chat_entries)
+class LatencySketch:
+    """
+    Log-bucketed histogram for latency quantiles.
+
+    Bucket k covers (gamma^(k-1), gamma^k], so any quantile is reported within
+    RELATIVE_ACCURACY of a real sample. Memory is bounded by the dynamic range
+    (a few hundred buckets for 1 ms .. 1 h), not by the number of samples, and
+    two sketches merge by adding bucket counts.
+    """
+
+    RELATIVE_ACCURACY = 0.01
+    GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+    LOG_GAMMA = math.log(GAMMA)
+    QUANTILES = (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99))
+
+    def __init__(self) -> None:
+        self.buckets: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def bucket_of(cls, v: float) -> int | None:
+        """Bucket index for a positive latency; None for the zero bucket."""
+        return math.ceil(math.log(v) / cls.LOG_GAMMA) if v > 0 else None
+
+    def add(self, v: float, n: int = 1) -> None:
+        if not math.isfinite(v):
+            return
+        self.count += n
+        if v < self.min:
+            self.min = v
+        if v > self.max:
+            self.max = v
+        if v <= 0:
+            self.zero_count += n
+            return
+        k = math.ceil(math.log(v) / self.LOG_GAMMA)
+        self.buckets[k] = self.buckets.get(k, 0) + n
+
+    def merge(self, other: "LatencySketch") -> "LatencySketch":
+        self.count += other.count
+        self.zero_count += other.zero_count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for k, n in other.buckets.items():
+            self.buckets[k] = self.buckets.get(k, 0) + n
+        return self
+
+    def to_state(self) -> dict[str, Any]:
+        return {
+            "buckets": [[k, n] for k, n in self.buckets.items()],
+            "zero": self.zero_count,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "LatencySketch":
+        sketch = cls()
+        sketch.buckets = {int(k): int(n) for k, n in state["buckets"]}
+        sketch.zero_count = state["zero"]
+        sketch.count = state["count"]
+        if sketch.count:
+            sketch.min = state["min"]
+            sketch.max = state["max"]
+        return sketch
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        value = self.max
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if rank < seen:
+                value = 2 * self.GAMMA ** k / (self.GAMMA + 1)
+                break
+        return min(max(value, self.min), self.max)
 
-    model_counts = Counter(str(e.get("finalModel") or e.get("selectedModel") or "unknown") for e in chat_entries)
-    source_counts = Counter(str(e.get("modelSource", "unknown")) for e in chat_entries)
-    task_counts = Counter(str(e.get("taskType", "unknown")) for e in chat_entries)
-    session_counts = Counter(str(e.get("sessionKey", "unknown")) for e in chat_entries)
+    def log_median_mad(self) -> tuple[float, float]:
+        """
+        Median and median absolute deviation of ln(latency), read off the
+        bucket indices (zero latencies are left out).
+        """
+        n = self.count - self.zero_count
+        if n <= 0:
+            return 0.0, 0.0
+        keys = sorted(self.buckets)
+        seen = 0
+        mid = keys[-1]
+        for k in keys:
+            seen += self.buckets[k]
+            if seen * 2 >= n:
+                mid = k
+                break
+        devs: dict[int, int] = defaultdict(int)
+        for k in keys:
+            devs[abs(k - mid)] += self.buckets[k]
+        seen = 0
+        mad = 0
+        for d in sorted(devs):
+            seen += devs[d]
+            if seen * 2 >= n:
+                mad = d
+                break
+        return mid * self.LOG_GAMMA, mad * self.LOG_GAMMA
 
-    escalation_total = sum(1 for e in chat_entries if bool(e.get("toolGateEscalated")))
-    tool_gate_total = sum(1 for e in chat_entries if bool(e.get("toolGateActive")))
-    tool_gate_success_total = sum(1 for e in chat_entries if bool(e.get("toolGateHadValidToolCalls")))
+    def count_above(self, v: float) -> int:
+        """Samples in buckets lying wholly above v."""
+        k = self.bucket_of(v)
+        if k is None:
+            return self.count - self.zero_count
+        return sum(n for b, n in self.buckets.items() if b > k)
 
-    retries = [safe_num(e.get("toolGateRetryCount")) for e in chat_entries]
-    retries = [x for x in retries if x is not None]
-    avg_retries = (sum(retries) / len(retries)) if retries else 0.0
+    def to_report(self) -> dict[str, Any]:
+        out: dict[str, Any] = {"count": self.count}
+        for name, q in self.QUANTILES:
+            out[name] = round(self.quantile(q), 2)
+        out["max"] = round(self.max, 2) if self.count else 0.0
+        return out
 
-    latencies = [safe_num(e.get("responseTimeMs")) for e in chat_entries]
-    latencies = [x for x in latencies if x is not None]
-    avg_latency_ms = (sum(latencies) / len(latencies)) if latencies else 0.0
 
-    latency_by_model: dict[str, list[float]] = defaultdict(list)
-    for e in chat_entries:
-        m = str(e.get("finalModel") or e.get("selectedModel") or "unknown")
+@dataclass(frozen=True)
+class SummaryOptions:
+    """Optional report sections. Anything beyond the defaults bypasses the summary cache."""
+
+    bucket_ms: int = 0
+    bucket_by_model: bool = False
+    since_ms: int | None = None
+    until_ms: int | None = None
+    timeline: bool = False
+    gate_overhead: bool = False
+    concurrency: bool = False
+    slowest: int = 0
+
+    @property
+    def extended(self) -> bool:
+        return self != SummaryOptions()
+
+    @property
+    def extended_rows(self) -> bool:
+        """Sections that only the row-wise reducers implement."""
+        return bool(self.bucket_ms or self.timeline or self.gate_overhead or self.concurrency or self.slowest)
+
+    @property
+    def time_bounded(self) -> bool:
+        return self.since_ms is not None or self.until_ms is not None
+
+
+class TimeSeries:
+    """
+    Chat completions grouped into UTC-aligned time buckets, optionally per
+    model: request, error (HTTP >= 400) and escalation counts plus a latency
+    sketch per bucket. Mergeable like RouterSummary.
+    """
+
+    def __init__(self, bucket_ms: int, by_model: bool) -> None:
+        self.bucket_ms = bucket_ms
+        self.by_model = by_model
+        # (bucket_start_ms, group) -> [requests, errors, escalations, latency_sum, sketch]
+        self.buckets: dict[tuple[int, str], list[Any]] = {}
+
+    def add(self, e: dict[str, Any], mdl: str, rt: float | None) -> None:
+        ts = safe_num(e.get("ts"))
+        if ts is None or not math.isfinite(ts):
+            return
+        start = int(ts - ts % self.bucket_ms)
+        key = (start, mdl if self.by_model else "all")
+        row = self.buckets.get(key)
+        if row is None:
+            row = self.buckets[key] = [0, 0, 0, 0.0, LatencySketch()]
+        row[0] += 1
+        status = safe_num(e.get("responseStatusCode"))
+        if status is not None and status >= 400:
+            row[1] += 1
+        if e.get("toolGateEscalated"):
+            row[2] += 1
+        if rt is not None and math.isfinite(rt):
+            row[3] += rt
+            row[4].add(rt)
+
+    def merge(self, other: "TimeSeries") -> None:
+        for key, (requests, errors, escalations, latency_sum, sketch) in other.buckets.items():
+            row = self.buckets.get(key)
+            if row is None:
+                self.buckets[key] = [requests, errors, escalations, latency_sum, LatencySketch().merge(sketch)]
+                continue
+            row[0] += requests
+            row[1] += errors
+            row[2] += escalations
+            row[3] += latency_sum
+            row[4].merge(sketch)
+
+    def to_report(self) -> list[dict[str, Any]]:
+        rows = []
+        for (start, group), (requests, errors, escalations, latency_sum, sketch) in sorted(self.buckets.items()):
+            rows.append({
+                "bucket_start": format_ms(start),
+                "group": group,
+                "requests": requests,
+                "errors": errors,
+                "escalations": escalations,
+                "avg_ms": round(latency_sum / sketch.count, 2) if sketch.count else 0.0,
+                **{k: v for k, v in sketch.to_report().items() if k != "count"},
+            })
+        return rows
+
+
+GATE_CLASSES = ("ungated", "clean", "retried", "escalated")
+
+
+class GateOverhead:
+    """
+    Latency cost of the proxy's tool-gate loop.
+
+    Requests are split by the model the client asked for (originalModel;
+    the proxy overwrites selectedModel on escalation) and task type into
+    ungated, clean (gated, first answer accepted), retried and escalated.
+    A retried or escalated request costs its latency minus the clean mean
+    for the same model and task (the ungated mean when there is no clean
+    sample), so extra round trips are priced against what the same request
+    shape costs without them. Mergeable like RouterSummary.
+    """
+
+    def __init__(self) -> None:
+        # (day, model, task, class) -> [requests, latency_sum, latency_n, retry_sum, valid_tool_calls]
+        self.groups: dict[tuple[str, str, str, str], list[float]] = {}
+        # (model, gated) -> latency sketch
+        self.sketches: dict[tuple[str, bool], LatencySketch] = {}
+
+    def add(self, e: dict[str, Any], task: str, rt: float | None) -> None:
+        # Older records have no originalModel; their selectedModel was not rewritten.
+        mdl = str(e.get("originalModel") or e.get("selectedModel") or e.get("finalModel") or "unknown")
+        gated = bool(e.get("toolGateActive"))
+        retries = safe_num(e.get("toolGateRetryCount")) or 0.0
+        if not gated:
+            cls = "ungated"
+        elif e.get("toolGateEscalated"):
+            cls = "escalated"
+        elif retries > 0:
+            cls = "retried"
+        else:
+            cls = "clean"
+        ts = safe_num(e.get("ts"))
+        day = format_ms(ts)[:10] if ts is not None and math.isfinite(ts) else "unknown"
+        row = self.groups.get((day, mdl, task, cls))
+        if row is None:
+            row = self.groups[(day, mdl, task, cls)] = [0, 0.0, 0, 0.0, 0]
+        row[0] += 1
+        row[3] += retries if math.isfinite(retries) else 0.0
+        row[4] += 1 if e.get("toolGateHadValidToolCalls") else 0
+        if rt is None or not math.isfinite(rt):
+            return
+        row[1] += rt
+        row[2] += 1
+        sketch = self.sketches.get((mdl, gated))
+        if sketch is None:
+            sketch = self.sketches[(mdl, gated)] = LatencySketch()
+        sketch.add(rt)
+
+    def merge(self, other: "GateOverhead") -> None:
+        for key, theirs in other.groups.items():
+            row = self.groups.get(key)
+            if row is None:
+                self.groups[key] = list(theirs)
+                continue
+            for i, v in enumerate(theirs):
+                row[i] += v
+        for key, sketch in other.sketches.items():
+            mine = self.sketches.get(key)
+            if mine is None:
+                self.sketches[key] = LatencySketch().merge(sketch)
+            else:
+                mine.merge(sketch)
+
+    def _baselines(self) -> dict[tuple[str, str], float]:
+        sums: dict[tuple[str, str, str], list[float]] = defaultdict(lambda: [0.0, 0])
+        for (_, mdl, task, cls), row in self.groups.items():
+            if cls in ("clean", "ungated"):
+                acc = sums[(mdl, task, cls)]
+                acc[0] += row[1]
+                acc[1] += row[2]
+        out: dict[tuple[str, str], float] = {}
+        for (mdl, task, cls), (total, n) in sums.items():
+            if n and (cls == "clean" or (mdl, task) not in out):
+                out[(mdl, task)] = total / n
+        return out
+
+    def to_report(self) -> dict[str, Any]:
+        baselines = self._baselines()
+        by_day: dict[str, float] = defaultdict(float)
+        by_model: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        by_task: dict[str, dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        retry_extra = retry_count = escalation_extra = escalation_count = 0.0
+        for (day, mdl, task, cls), (n, latency_sum, latency_n, retry_sum, valid) in self.groups.items():
+            extra = 0.0
+            base = baselines.get((mdl, task))
+            if cls in ("retried", "escalated") and base is not None and latency_n:
+                extra = max(0.0, latency_sum - latency_n * base)
+            if cls == "retried":
+                retry_extra += extra
+                retry_count += retry_sum
+            elif cls == "escalated":
+                escalation_extra += extra
+                escalation_count += n
+            by_day[day] += extra
+            for acc in (by_model[mdl], by_task[task]):
+                acc[cls] += n
+                acc["extra_ms"] += extra
+                if cls != "ungated":
+                    acc["gated"] += n
+                    acc["valid"] += valid
+
+        def gate_row(acc: dict[str, float]) -> dict[str, Any]:
+            gated = int(acc["gated"])
+            return {
+                "gated": gated,
+                "ungated": int(acc["ungated"]),
+                "retried": int(acc["retried"]),
+                "escalated": int(acc["escalated"]),
+                "valid_tool_calls_pct": round(acc["valid"] / gated * 100, 2) if gated else 0.0,
+                "extra_ms_total": round(acc["extra_ms"], 1),
+                "extra_ms_per_gated_request": round(acc["extra_ms"] / gated, 1) if gated else 0.0,
+            }
+
+        models = {}
+        for mdl, acc in sorted(by_model.items()):
+            models[mdl] = gate_row(acc)
+            for gated, label in ((True, "latency_gated_ms"), (False, "latency_ungated_ms")):
+                sketch = self.sketches.get((mdl, gated))
+                models[mdl][label] = sketch.to_report() if sketch else None
+        total_extra = sum(by_day.values())
+        return {
+            "extra_ms_per_retry": round(retry_extra / retry_count, 1) if retry_count else 0.0,
+            "extra_ms_per_escalation": round(escalation_extra / escalation_count, 1) if escalation_count else 0.0,
+            "extra_wall_s_total": round(total_extra / 1000, 1),
+            "extra_wall_s_by_day": {day: round(ms / 1000, 1) for day, ms in sorted(by_day.items())},
+            "by_model": models,
+            "by_task": {task: gate_row(acc) for task, acc in sorted(by_task.items())},
+        }
+
+
+# Upper bounds of the arrival-concurrency bands in the latency-vs-load table.
+CONCURRENCY_BANDS = (1, 2, 4, 8, 16, 32, 64)
+CONCURRENCY_QUANTILES = (("p50", 0.50), ("p90", 0.90), ("p95", 0.95), ("p99", 0.99))
+
+
+def _level_quantiles(level_ms: dict[int, float]) -> dict[str, int]:
+    """Time-weighted quantiles of the in-flight count over busy time."""
+    total = sum(level_ms.values())
+    out = {name: 0 for name, _ in CONCURRENCY_QUANTILES}
+    if not total:
+        return out
+    levels = sorted(level_ms)
+    for name, q in CONCURRENCY_QUANTILES:
+        seen = 0.0
+        for level in levels:
+            seen += level_ms[level]
+            if seen >= q * total:
+                out[name] = level
+                break
+    return out
+
+
+def _ranks(values: list[float]) -> list[float]:
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    i = 0
+    while i < len(order):
+        j = i
+        while j + 1 < len(order) and values[order[j + 1]] == values[order[i]]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[order[k]] = (i + j) / 2
+        i = j + 1
+    return ranks
+
+
+def _pearson(xs: list[float], ys: list[float]) -> float | None:
+    n = len(xs)
+    if n < 3:
+        return None
+    mx = sum(xs) / n
+    my = sum(ys) / n
+    sxy = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    sxx = sum((x - mx) ** 2 for x in xs)
+    syy = sum((y - my) ** 2 for y in ys)
+    if not sxx or not syy:
+        return None
+    return sxy / math.sqrt(sxx * syy)
+
+
+def sweep_concurrency(starts: list[float], ends: list[float]) -> tuple[int, dict[int, float]]:
+    """
+    Sweep the [start, end) intervals in time order; returns the peak
+    in-flight count and the milliseconds spent at each non-zero count.
+    Ends sort before starts at the same instant, so back-to-back requests
+    do not overlap.
+    """
+    ss = sorted(starts)
+    es = sorted(ends)
+    n = len(ss)
+    level_ms: dict[int, float] = defaultdict(float)
+    i = j = level = peak = 0
+    prev = ss[0] if n else 0.0
+    # Every start precedes its own end, so ends never run out while starts remain.
+    while j < n:
+        if i < n and ss[i] < es[j]:
+            t, step = ss[i], 1
+            i += 1
+        else:
+            t, step = es[j], -1
+            j += 1
+        if level and t > prev:
+            level_ms[level] += t - prev
+        prev = t
+        level += step
+        if level > peak:
+            peak = level
+    return peak, level_ms
+
+
+def arrival_levels(starts: list[float], ends: list[float]) -> list[int]:
+    """In-flight count each request saw on arrival, itself included, in input order."""
+    ss = sorted(starts)
+    es = sorted(ends)
+    return [bisect.bisect_right(ss, s) - bisect.bisect_right(es, s) for s in starts]
+
+
+class Concurrency:
+    """
+    In-flight load rebuilt from the logs: a chat completion occupies
+    [ts - responseTimeMs, ts). Only the intervals are collected while
+    streaming (mergeable like RouterSummary); the sweep runs in to_report().
+    """
+
+    def __init__(self) -> None:
+        self.models: list[str] = []
+        self.model_ids: dict[str, int] = {}
+        self.starts = array.array("d")
+        self.ends = array.array("d")
+        self.model_of = array.array("I")
+
+    def _model_id(self, mdl: str) -> int:
+        mid = self.model_ids.get(mdl)
+        if mid is None:
+            mid = self.model_ids[mdl] = len(self.models)
+            self.models.append(mdl)
+        return mid
+
+    def add(self, e: dict[str, Any], mdl: str, rt: float | None) -> None:
+        ts = safe_num(e.get("ts"))
+        # Zero-length requests never hold a slot.
+        if ts is None or rt is None or not math.isfinite(ts) or not math.isfinite(rt) or rt <= 0:
+            return
+        self.starts.append(ts - rt)
+        self.ends.append(ts)
+        self.model_of.append(self._model_id(mdl))
+
+    def merge(self, other: "Concurrency") -> None:
+        remap = [self._model_id(mdl) for mdl in other.models]
+        self.starts.extend(other.starts)
+        self.ends.extend(other.ends)
+        self.model_of.extend(remap[mid] for mid in other.model_of)
+
+    @staticmethod
+    def _minutes(starts: list[float], ends: list[float], levels: list[int]) -> list[dict[str, Any]]:
+        ss = sorted(starts)
+        es = sorted(ends)
+        busy_ms: dict[int, float] = defaultdict(float)
+        arrivals: Counter = Counter()
+        for s, t in zip(starts, ends):
+            minute = int(s // 60_000) * 60_000
+            arrivals[minute] += 1
+            while minute < t:
+                busy_ms[minute] += min(t, minute + 60_000) - max(s, minute)
+                minute += 60_000
+        # A minute's peak is reached at its first instant or at one of its arrivals.
+        peaks: dict[int, int] = {
+            m: bisect.bisect_right(ss, m) - bisect.bisect_right(es, m) for m in busy_ms
+        }
+        for s, level in zip(starts, levels):
+            minute = int(s // 60_000) * 60_000
+            if level > peaks[minute]:
+                peaks[minute] = level
+        return [
+            {
+                "minute": format_ms(m),
+                "arrivals": arrivals[m],
+                "peak": peaks[m],
+                "avg": round(busy_ms[m] / 60_000, 2),
+            }
+            for m in sorted(busy_ms)
+        ]
+
+    def to_report(self) -> dict[str, Any]:
+        starts = list(self.starts)
+        ends = list(self.ends)
+        latency = [t - s for s, t in zip(starts, ends)]
+        peak, level_ms = sweep_concurrency(starts, ends)
+        busy = sum(level_ms.values())
+        levels = arrival_levels(starts, ends)
+
+        bands: dict[str, LatencySketch] = {}
+        for level, rt in zip(levels, latency):
+            upper = next((b for b in CONCURRENCY_BANDS if level <= b), None)
+            lower = max((b for b in CONCURRENCY_BANDS if b < level), default=0) + 1
+            label = (str(upper) if upper == lower else f"{lower}-{upper}") if upper else f"{lower}+"
+            sketch = bands.get(label)
+            if sketch is None:
+                sketch = bands[label] = LatencySketch()
+            sketch.add(rt)
+
+        members: list[list[int]] = [[] for _ in self.models]
+        for i, mid in enumerate(self.model_of):
+            members[mid].append(i)
+        by_model = {}
+        for mdl, idx in zip(self.models, members):
+            m_starts = [starts[i] for i in idx]
+            m_ends = [ends[i] for i in idx]
+            m_peak, m_level_ms = sweep_concurrency(m_starts, m_ends)
+            m_busy = sum(m_level_ms.values())
+            m_levels = arrival_levels(m_starts, m_ends)
+            m_latency = [latency[i] for i in idx]
+            rho = _pearson(_ranks(m_levels), _ranks(m_latency))
+            by_model[mdl] = {
+                "requests": len(idx),
+                "peak": m_peak,
+                "avg_busy": round(sum(lv * ms for lv, ms in m_level_ms.items()) / m_busy, 2) if m_busy else 0.0,
+                **_level_quantiles(m_level_ms),
+                "latency_vs_concurrency_spearman": round(rho, 3) + 0.0 if rho is not None else None,
+            }
+
+        minutes = self._minutes(starts, ends, levels)
+        minute_peaks = sorted(row["peak"] for row in minutes)
+        rho = _pearson(_ranks(levels), _ranks(latency))
+        return {
+            "requests": len(starts),
+            "peak": peak,
+            "busy_s": round(busy / 1000, 1),
+            "avg_busy": round(sum(lv * ms for lv, ms in level_ms.items()) / busy, 2) if busy else 0.0,
+            **_level_quantiles(level_ms),
+            "minute_peak_percentiles": {
+                name: minute_peaks[min(len(minute_peaks) - 1, int(q * len(minute_peaks)))] if minute_peaks else 0
+                for name, q in CONCURRENCY_QUANTILES
+            },
+            "latency_vs_concurrency_spearman": round(rho, 3) + 0.0 if rho is not None else None,
+            "latency_by_arrival_concurrency": {
+                label: bands[label].to_report()
+                for label in sorted(bands, key=lambda b: int(b.split("-")[0].rstrip("+")))
+            },
+            "by_model": dict(sorted(by_model.items(), key=lambda kv: -kv[1]["requests"])),
+            "by_minute": minutes,
+        }
+
+
+# Fields kept for each --slowest row.
+SLOWEST_FIELDS = (
+    "ts", "sessionKey", "taskType", "selectedModel", "finalModel", "toolsCount", "userMessageChars",
+    "toolGateActive", "toolGateRetryCount", "toolGateEscalated", "responseStatusCode", "responseTimeMs",
+    "userMessagePreview",
+)
+# Iglewicz-Hoaglin: |0.6745 * (x - median) / MAD| above this is an outlier.
+OUTLIER_Z = 3.5
+
+
+class SlowestRequests:
+    """
+    The N slowest chat completions, kept in a min-heap so memory stays O(N)
+    however long the window. Ties on latency keep the later ts, then the
+    larger sessionKey, so serial and --workers runs list the same rows.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.heap: list[tuple[float, float, str, int, dict[str, Any]]] = []
+        self.seq = 0
+
+    def _push(self, item: tuple[float, float, str, int, dict[str, Any]]) -> None:
+        if len(self.heap) < self.limit:
+            heapq.heappush(self.heap, item)
+        elif item[:3] > self.heap[0][:3]:
+            heapq.heapreplace(self.heap, item)
+
+    def add(self, e: dict[str, Any], mdl: str, rt: float | None) -> None:
+        if rt is None or not math.isfinite(rt):
+            return
+        if len(self.heap) >= self.limit and rt < self.heap[0][0]:
+            return
+        ts = safe_num(e.get("ts"))
+        ts = ts if ts is not None and math.isfinite(ts) else 0.0
+        # Rows keep the logged responseTimeMs; the float rt only orders and scores them.
+        row = {name: e.get(name) for name in SLOWEST_FIELDS}
+        row["model"] = mdl
+        self.seq += 1
+        self._push((rt, ts, str(e.get("sessionKey", "")), self.seq, row))
+
+    def merge(self, other: "SlowestRequests") -> None:
+        for rt, ts, session, _, row in other.heap:
+            self.seq += 1
+            self._push((rt, ts, session, self.seq, row))
+
+    def to_report(self, sketches: dict[str, LatencySketch]) -> dict[str, Any]:
+        """Rows slowest first, scored against each model's full latency distribution."""
+        stats: dict[str, tuple[float, float]] = {}
+        outliers_by_model = {}
+        for mdl, sketch in sorted(sketches.items()):
+            median, mad = sketch.log_median_mad()
+            stats[mdl] = (median, mad)
+            threshold = math.exp(median + OUTLIER_Z * mad / 0.6745) if mad else None
+            outliers_by_model[mdl] = {
+                "requests": sketch.count,
+                "median_ms": round(math.exp(median), 2) if sketch.count > sketch.zero_count else 0.0,
+                "outlier_threshold_ms": round(threshold, 2) if threshold is not None else None,
+                "outliers": sketch.count_above(threshold) if threshold is not None else 0,
+            }
+        rows = []
+        for rt, *_, row in sorted(self.heap, key=lambda item: item[:3], reverse=True):
+            median, mad = stats.get(row["model"], (0.0, 0.0))
+            z = 0.6745 * (math.log(rt) - median) / mad if mad and rt > 0 else None
+            rows.append({
+                **row,
+                "robust_z": round(z, 2) if z is not None else None,
+                "outlier": z is not None and z > OUTLIER_Z,
+            })
+        return {"limit": self.limit, "rows": rows, "outliers_by_model": outliers_by_model}
+
+
+# Per-request fields kept for a --session timeline.
+TIMELINE_FIELDS = (
+    "ts", "taskType", "selectedModel", "finalModel", "modelSource", "toolsCount", "userMessageChars",
+    "toolGateActive", "toolGateRetryCount", "toolGateEscalated", "responseStatusCode", "responseTimeMs",
+)
+
+
+def _timeline_order(row: dict[str, Any]) -> float:
+    ts = safe_num(row["ts"])
+    return ts if ts is not None and math.isfinite(ts) else 0.0
+
+
+class RouterSummary:
+    """
+    Single-pass aggregate over router decision records.
+
+    Every metric in the report is updated by add(); partial aggregates built
+    over consecutive slices of the log can be combined with merge() and give
+    the same report as one aggregate over the whole window.
+    """
+
+    def __init__(self, options: SummaryOptions | None = None) -> None:
+        self.options = options or SummaryOptions()
+        self.total = 0
+        self.chat_total = 0
+        self.model_counts: Counter = Counter()
+        self.source_counts: Counter = Counter()
+        self.task_counts: Counter = Counter()
+        self.session_counts: Counter = Counter()
+        self.escalation_total = 0
+        self.tool_gate_total = 0
+        self.tool_gate_success_total = 0
+        self.retry_sum = 0.0
+        self.retry_n = 0
+        self.latency_sum = 0.0
+        self.latency_n = 0
+        self.latency_by_model: dict[str, list[float]] = {}
+        self.latency_sketch = LatencySketch()
+        self.latency_sketch_by_model: dict[str, LatencySketch] = {}
+        self.latency_sketch_by_task: dict[str, LatencySketch] = {}
+        self.model_by_task: dict[str, Counter] = defaultdict(Counter)
+        self.series = TimeSeries(self.options.bucket_ms, self.options.bucket_by_model) if self.options.bucket_ms else None
+        self.timeline: list[dict[str, Any]] | None = [] if self.options.timeline else None
+        self.gate = GateOverhead() if self.options.gate_overhead else None
+        self.concurrency = Concurrency() if self.options.concurrency else None
+        self.slowest = SlowestRequests(self.options.slowest) if self.options.slowest else None
+
+    def add(self, e: dict[str, Any]) -> None:
+        self.total += 1
+        if e.get("event") != "chat_completion":
+            return
+        self.chat_total += 1
+
+        mdl = str(e.get("finalModel") or e.get("selectedModel") or "unknown")
+        task = str(e.get("taskType", "unknown"))
+        self.model_counts[mdl] += 1
+        self.source_counts[str(e.get("modelSource", "unknown"))] += 1
+        self.task_counts[task] += 1
+        self.session_counts[str(e.get("sessionKey", "unknown"))] += 1
+        self.model_by_task[task][mdl] += 1
+
+        if e.get("toolGateEscalated"):
+            self.escalation_total += 1
+        if e.get("toolGateActive"):
+            self.tool_gate_total += 1
+        if e.get("toolGateHadValidToolCalls"):
+            self.tool_gate_success_total += 1
+
+        retries = safe_num(e.get("toolGateRetryCount"))
+        if retries is not None:
+            self.retry_sum += retries
+            self.retry_n += 1
+
         rt = safe_num(e.get("responseTimeMs"))
         if rt is not None:
-            latency_by_model[m].append(rt)
-    avg_latency_by_model = {
-        m: round(sum(vals) / len(vals), 2) for m, vals in latency_by_model.items() if vals
+            self.latency_sum += rt
+            self.latency_n += 1
+            acc = self.latency_by_model.get(mdl)
+            if acc is None:
+                self.latency_by_model[mdl] = [rt, 1]
+            else:
+                acc[0] += rt
+                acc[1] += 1
+            self.latency_sketch.add(rt)
+            sketch = self.latency_sketch_by_model.get(mdl)
+            if sketch is None:
+                sketch = self.latency_sketch_by_model[mdl] = LatencySketch()
+            sketch.add(rt)
+            sketch = self.latency_sketch_by_task.get(task)
+            if sketch is None:
+                sketch = self.latency_sketch_by_task[task] = LatencySketch()
+            sketch.add(rt)
+
+        if self.series is not None:
+            self.series.add(e, mdl, rt)
+        if self.timeline is not None:
+            self.timeline.append({name: e.get(name) for name in TIMELINE_FIELDS})
+        if self.gate is not None:
+            self.gate.add(e, task, rt)
+        if self.concurrency is not None:
+            self.concurrency.add(e, mdl, rt)
+        if self.slowest is not None:
+            self.slowest.add(e, mdl, rt)
+
+    def merge(self, other: "RouterSummary") -> "RouterSummary":
+        self.total += other.total
+        self.chat_total += other.chat_total
+        self.model_counts.update(other.model_counts)
+        self.source_counts.update(other.source_counts)
+        self.task_counts.update(other.task_counts)
+        self.session_counts.update(other.session_counts)
+        self.escalation_total += other.escalation_total
+        self.tool_gate_total += other.tool_gate_total
+        self.tool_gate_success_total += other.tool_gate_success_total
+        self.retry_sum += other.retry_sum
+        self.retry_n += other.retry_n
+        self.latency_sum += other.latency_sum
+        self.latency_n += other.latency_n
+        for mdl, (total, n) in other.latency_by_model.items():
+            acc = self.latency_by_model.setdefault(mdl, [0.0, 0])
+            acc[0] += total
+            acc[1] += n
+        self.latency_sketch.merge(other.latency_sketch)
+        for mdl, sketch in other.latency_sketch_by_model.items():
+            self.latency_sketch_by_model.setdefault(mdl, LatencySketch()).merge(sketch)
+        for task, sketch in other.latency_sketch_by_task.items():
+            self.latency_sketch_by_task.setdefault(task, LatencySketch()).merge(sketch)
+        for task, counter in other.model_by_task.items():
+            self.model_by_task[task].update(counter)
+        if self.series is not None and other.series is not None:
+            self.series.merge(other.series)
+        if self.timeline is not None and other.timeline is not None:
+            self.timeline.extend(other.timeline)
+        if self.gate is not None and other.gate is not None:
+            self.gate.merge(other.gate)
+        if self.concurrency is not None and other.concurrency is not None:
+            self.concurrency.merge(other.concurrency)
+        if self.slowest is not None and other.slowest is not None:
+            self.slowest.merge(other.slowest)
+        return self
+
+    def _time_filters(self) -> dict[str, str | None]:
+        if not self.options.time_bounded:
+            return {}
+        return {
+            "since": format_ms(self.options.since_ms) if self.options.since_ms is not None else None,
+            "until": format_ms(self.options.until_ms) if self.options.until_ms is not None else None,
+        }
+
+    def to_state(self) -> dict[str, Any]:
+        """JSON-safe snapshot; Counter order is kept so a reload reports identically."""
+        return {
+            "total": self.total,
+            "chat_total": self.chat_total,
+            "model_counts": dict(self.model_counts),
+            "source_counts": dict(self.source_counts),
+            "task_counts": dict(self.task_counts),
+            "session_counts": dict(self.session_counts),
+            "escalation_total": self.escalation_total,
+            "tool_gate_total": self.tool_gate_total,
+            "tool_gate_success_total": self.tool_gate_success_total,
+            "retry": [self.retry_sum, self.retry_n],
+            "latency": [self.latency_sum, self.latency_n],
+            "latency_by_model": self.latency_by_model,
+            "latency_sketch": self.latency_sketch.to_state(),
+            "latency_sketch_by_model": {m: sk.to_state() for m, sk in self.latency_sketch_by_model.items()},
+            "latency_sketch_by_task": {t: sk.to_state() for t, sk in self.latency_sketch_by_task.items()},
+            "model_by_task": {t: dict(c) for t, c in self.model_by_task.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any]) -> "RouterSummary":
+        agg = cls()
+        agg.total = state["total"]
+        agg.chat_total = state["chat_total"]
+        agg.model_counts = Counter(state["model_counts"])
+        agg.source_counts = Counter(state["source_counts"])
+        agg.task_counts = Counter(state["task_counts"])
+        agg.session_counts = Counter(state["session_counts"])
+        agg.escalation_total = state["escalation_total"]
+        agg.tool_gate_total = state["tool_gate_total"]
+        agg.tool_gate_success_total = state["tool_gate_success_total"]
+        agg.retry_sum, agg.retry_n = state["retry"]
+        agg.latency_sum, agg.latency_n = state["latency"]
+        agg.latency_by_model = {m: list(v) for m, v in state["latency_by_model"].items()}
+        agg.latency_sketch = LatencySketch.from_state(state["latency_sketch"])
+        agg.latency_sketch_by_model = {
+            m: LatencySketch.from_state(sk) for m, sk in state["latency_sketch_by_model"].items()
+        }
+        agg.latency_sketch_by_task = {
+            t: LatencySketch.from_state(sk) for t, sk in state["latency_sketch_by_task"].items()
+        }
+        for t, c in state["model_by_task"].items():
+            agg.model_by_task[t] = Counter(c)
+        return agg
+
+    def to_report(self, days: int, session: str, model: str) -> dict[str, Any]:
+        chat_total = self.chat_total
+        avg_retries = (self.retry_sum / self.retry_n) if self.retry_n else 0.0
+        avg_latency_ms = (self.latency_sum / self.latency_n) if self.latency_n else 0.0
+        avg_latency_by_model = {
+            m: round(total / n, 2) for m, (total, n) in self.latency_by_model.items() if n
+        }
+        escalation_total = self.escalation_total
+        tool_gate_total = self.tool_gate_total
+        tool_gate_success_total = self.tool_gate_success_total
+
+        report = {
+            "window_days": days,
+            "filters": {"session": session or None, "model": model or None, **self._time_filters()},
+            "total_events": self.total,
+            "chat_events": chat_total,
+            "session_count": len(self.session_counts),
+            "model_counts": dict(self.model_counts.most_common()),
+            "model_source_counts": dict(self.source_counts.most_common()),
+            "task_type_counts": dict(self.task_counts.most_common()),
+            "top_sessions": dict(self.session_counts.most_common(10)),
+            "tool_gate": {
+                "active_count": tool_gate_total,
+                "success_count": tool_gate_success_total,
+                "escalation_count": escalation_total,
+                "escalation_rate_pct": round((escalation_total / chat_total) * 100, 2) if chat_total else 0.0,
+                "active_success_rate_pct": round((tool_gate_success_total / tool_gate_total) * 100, 2) if tool_gate_total else 0.0,
+                "avg_retry_count": round(avg_retries, 2),
+            },
+            "latency": {
+                "avg_ms": round(avg_latency_ms, 2),
+                "avg_ms_by_model": avg_latency_by_model,
+                "percentiles_ms": self.latency_sketch.to_report(),
+                "percentiles_ms_by_model": {
+                    m: sketch.to_report() for m, sketch in self.latency_sketch_by_model.items()
+                },
+                "percentiles_ms_by_task": {
+                    t: sketch.to_report() for t, sketch in sorted(self.latency_sketch_by_task.items())
+                },
+            },
+            "model_by_task": {
+                task: dict(counter.most_common()) for task, counter in sorted(self.model_by_task.items())
+            },
+        }
+        if self.series is not None:
+            report["series"] = {
+                "bucket_s": self.options.bucket_ms // 1000,
+                "by_model": self.options.bucket_by_model,
+                "rows": self.series.to_report(),
+            }
+        if self.timeline is not None:
+            report["timeline"] = sorted(self.timeline, key=_timeline_order)
+        if self.gate is not None:
+            report["gate_overhead"] = self.gate.to_report()
+        if self.concurrency is not None:
+            report["concurrency"] = self.concurrency.to_report()
+        if self.slowest is not None:
+            report["slowest"] = self.slowest.to_report(self.latency_sketch_by_model)
+        return report
+
+
+def summarize(entries: Iterable[dict[str, Any]], days: int, session: str, model: str) -> dict[str, Any]:
+    agg = RouterSummary()
+    for e in entries:
+        agg.add(e)
+    return agg.to_report(days, session, model)
+
+
+# ── Per-day summary cache ────────────────────────────────────
+#
+# Each day file gets a sidecar <cache-dir>/<name>.summary.json holding the
+# RouterSummary state for the file's first `offset` bytes (always a line
+# boundary). Sealed days hit the cache with no parsing; the open day only
+# parses bytes appended since the last run. The cache is keyed by inode,
+# size and mtime, and is discarded when the file shrank or was rewritten.
+
+SUMMARY_CACHE_VERSION = 1
+
+
+def default_cache_dir(log_dir: Path) -> Path:
+    return log_dir / ".summary-cache"
+
+
+def read_day_cache(cache_dir: Path, path: Path) -> dict[str, Any] | None:
+    cp = cache_dir / f"{path.name}.summary.json"
+    try:
+        cached = json.loads(cp.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != SUMMARY_CACHE_VERSION:
+        return None
+    return cached
+
+
+def write_day_cache(cache_dir: Path, path: Path, payload: dict[str, Any]) -> None:
+    cp = cache_dir / f"{path.name}.summary.json"
+    tmp = cp.with_name(cp.name + ".tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, cp)
+    except OSError:
+        pass
+
+
+def summarize_day(path: Path, cache_dir: Path | None, decoder: str = "auto") -> RouterSummary:
+    """Summarize one day file, reusing and refreshing its cached prefix."""
+    decode = get_decoder(decoder, summary_only=True)
+    st = path.stat()
+    agg = RouterSummary()
+    offset = 0
+    cached = read_day_cache(cache_dir, path) if cache_dir else None
+    if is_compressed(path):
+        return summarize_archived_day(path, st, cache_dir, cached, decode)
+    if cached and cached["ino"] == st.st_ino and cached["offset"] <= st.st_size:
+        rewritten = cached["size"] == st.st_size and cached["mtime_ns"] != st.st_mtime_ns
+        if not rewritten:
+            agg = RouterSummary.from_state(cached["state"])
+            offset = cached["offset"]
+
+    # Only newline-terminated lines go into the cached prefix; an unterminated
+    # tail (a write in progress) is summarized for this run only.
+    tail = RouterSummary()
+    start = offset
+    with path.open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                for rec in iter_records((line,), decode):
+                    tail.add(rec)
+                break
+            offset += len(line)
+            raw = line.strip()
+            rec = decode(raw) if raw else None
+            if rec is not None:
+                agg.add(rec)
+
+    if cache_dir and (cached is None or offset != start or cached["size"] != st.st_size
+                      or cached["mtime_ns"] != st.st_mtime_ns):
+        write_day_cache(cache_dir, path, day_cache_payload(st, offset, agg))
+    return agg.merge(tail)
+
+
+def summarize_archived_day(
+    path: Path,
+    st: os.stat_result,
+    cache_dir: Path | None,
+    cached: dict[str, Any] | None,
+    decode: Callable[[bytes], dict[str, Any] | None],
+) -> RouterSummary:
+    """Compressed days are sealed: the cache is all-or-nothing."""
+    if cached and (cached["ino"], cached["size"], cached["mtime_ns"]) == (st.st_ino, st.st_size, st.st_mtime_ns):
+        return RouterSummary.from_state(cached["state"])
+    agg = RouterSummary()
+    with open_day_file(path) as f:
+        for rec in iter_records(f, decode):
+            agg.add(rec)
+    if cache_dir:
+        write_day_cache(cache_dir, path, day_cache_payload(st, st.st_size, agg))
+    return agg
+
+
+def day_cache_payload(st: os.stat_result, offset: int, agg: RouterSummary) -> dict[str, Any]:
+    return {
+        "version": SUMMARY_CACHE_VERSION,
+        "ino": st.st_ino,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "offset": offset,
+        "state": agg.to_state(),
     }
 
-    model_by_task: dict[str, Counter] = defaultdict(Counter)
-    for e in chat_entries:
-        task = str(e.get("taskType", "unknown"))
-        mdl = str(e.get("finalModel") or e.get("selectedModel") or "unknown")
-        model_by_task[task][mdl] += 1
+
+# ── Session index ────────────────────────────────────────────
+#
+# <index-dir>/<name>.sessions.u64 holds the byte offset of every complete
+# line of a day file, grouped by sessionKey; <name>.sessions.json maps each
+# session to its [start, count] slice and carries the same inode/size/mtime
+# key and indexed `offset` as the summary cache. Plain files are indexed
+# incrementally; offsets in compressed days refer to the decompressed
+# stream, which is identical to the plain file they were compacted from.
+
+SESSION_INDEX_VERSION = 1
+
+
+def default_index_dir(log_dir: Path) -> Path:
+    return log_dir / ".session-index"
+
+
+def read_session_index(index_dir: Path, path: Path) -> dict[str, Any] | None:
+    mp = index_dir / f"{path.name}.sessions.json"
+    try:
+        meta = json.loads(mp.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("version") != SESSION_INDEX_VERSION:
+        return None
+    return meta
+
+
+def write_session_index(index_dir: Path, path: Path, meta: dict[str, Any], offsets: array.array) -> None:
+    op = index_dir / f"{path.name}.sessions.u64"
+    mp = index_dir / f"{path.name}.sessions.json"
+    try:
+        index_dir.mkdir(parents=True, exist_ok=True)
+        tmp = op.with_name(op.name + ".tmp")
+        _write_array(tmp, offsets)
+        os.replace(tmp, op)
+        tmp = mp.with_name(mp.name + ".tmp")
+        tmp.write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, mp)
+    except OSError:
+        pass
+
+
+def _index_is_current(meta: dict[str, Any] | None, path: Path, st: os.stat_result) -> bool:
+    """True when meta covers a prefix of the file that is still there as written."""
+    if meta is None:
+        return False
+    if is_compressed(path):
+        return (meta["ino"], meta["size"], meta["mtime_ns"]) == (st.st_ino, st.st_size, st.st_mtime_ns)
+    rewritten = meta["size"] == st.st_size and meta["mtime_ns"] != st.st_mtime_ns
+    return meta["ino"] == st.st_ino and meta["offset"] <= st.st_size and not rewritten
+
+
+def update_session_index(
+    path: Path,
+    index_dir: Path,
+    decoder: str = "auto",
+) -> tuple[dict[str, Any], array.array | None]:
+    """
+    Bring the index for one day file up to date. Returns its meta and, when
+    the offsets were (re)built in this call, the offsets array; otherwise
+    the caller reads slices from disk.
+    """
+    st = path.stat()
+    meta = read_session_index(index_dir, path)
+    if not _index_is_current(meta, path, st):
+        meta = None
+    elif is_compressed(path) or meta["offset"] == st.st_size:
+        return meta, None
+
+    groups: dict[str, list[int]] = {}
+    offset = 0
+    if meta is not None:
+        old = _read_array(index_dir / f"{path.name}.sessions.u64", "Q")
+        for key, (start, count) in meta["sessions"].items():
+            groups[key] = [int(off) for off in old[start:start + count]]
+        offset = meta["offset"]
+
+    decode = get_decoder(decoder)
+    with open_day_file(path) as f:
+        if offset:
+            f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # A write in progress: left for the next update.
+                break
+            raw = line.strip()
+            rec = decode(raw) if raw else None
+            if rec is not None:
+                groups.setdefault(str(rec.get("sessionKey", "")), []).append(offset)
+            offset += len(line)
+
+    offsets = array.array("Q")
+    sessions: dict[str, list[int]] = {}
+    for key, offs in groups.items():
+        sessions[key] = [len(offsets), len(offs)]
+        offsets.extend(offs)
+    meta = {
+        "version": SESSION_INDEX_VERSION,
+        "ino": st.st_ino,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "offset": offset,
+        "sessions": sessions,
+    }
+    write_session_index(index_dir, path, meta, offsets)
+    return meta, offsets
+
+
+def session_offsets(
+    index_dir: Path,
+    path: Path,
+    meta: dict[str, Any],
+    offsets: array.array | None,
+    session: str,
+) -> list[int]:
+    start, count = meta["sessions"].get(session, (0, 0))
+    if not count:
+        return []
+    if offsets is not None:
+        return list(offsets[start:start + count])
+    out = array.array("Q")
+    with (index_dir / f"{path.name}.sessions.u64").open("rb") as f:
+        f.seek(start * out.itemsize)
+        out.frombytes(f.read(count * out.itemsize))
+    if sys.byteorder == "big":
+        out.byteswap()
+    return list(out)
+
+
+def iter_lines_at(f: BinaryIO, path: Path, offsets: list[int]) -> Iterator[bytes]:
+    """Yield the lines starting at the given ascending offsets."""
+    if not is_compressed(path):
+        for off in offsets:
+            f.seek(off)
+            yield f.readline()
+        return
+    # Compressed streams cannot seek: walk them, decoding only the wanted lines.
+    wanted = iter(offsets)
+    target = next(wanted, None)
+    pos = 0
+    for line in f:
+        if target is None:
+            return
+        if pos == target:
+            yield line
+            target = next(wanted, None)
+        pos += len(line)
+
+
+def summarize_session_day(
+    path: Path,
+    index_dir: Path,
+    session: str,
+    model: str,
+    decoder: str = "auto",
+    options: SummaryOptions | None = None,
+) -> RouterSummary:
+    """Summarize one session's records in a day file through the session index."""
+    meta, offsets = update_session_index(path, index_dir, decoder)
+    wanted = session_offsets(index_dir, path, meta, offsets, session)
+    agg = RouterSummary(options)
+    decode = get_decoder(decoder)
+    with open_day_file(path) as f:
+        lines = list(iter_lines_at(f, path, wanted))
+        if not is_compressed(path) and path.stat().st_size > meta["offset"]:
+            # The unterminated tail is not indexed yet; scan it directly.
+            f.seek(meta["offset"])
+            lines.extend(f)
+    records = iter_records(lines, decode)
+    if agg.options.time_bounded:
+        records = apply_time_range(records, agg.options.since_ms, agg.options.until_ms)
+    for rec in apply_filters(records, session, model):
+        agg.add(rec)
+    return agg
+
+
+# ── Compaction ───────────────────────────────────────────────
+#
+# Closed days are rewritten as <name>.gz / <name>.zst through a temp file
+# and os.replace(), and the plain file is removed only after the archive is
+# in place. A complete cached summary moves over to the archive so the next
+# report does not have to decompress it.
+
+def compress_file(src: Path, dst: Path, fmt: str, level: int | None) -> None:
+    tmp = dst.with_name(dst.name + ".tmp")
+    with src.open("rb") as fin:
+        if fmt == "gz":
+            with gzip.open(tmp, "wb", compresslevel=6 if level is None else level) as fout:
+                shutil.copyfileobj(fin, fout, 1024 * 1024)
+        else:
+            cctx = zstandard.ZstdCompressor(level=10 if level is None else level)
+            with tmp.open("wb") as fout:
+                cctx.copy_stream(fin, fout)
+    os.replace(tmp, dst)
+
+
+def compact_logs(
+    log_dir: Path,
+    fmt: str,
+    level: int | None,
+    keep_days: int,
+    cache_dir: Path | None,
+    index_dir: Path | None = None,
+) -> list[tuple[Path, int, int]]:
+    keep = set(days_in_window(keep_days)) if keep_days > 0 else set()
+    done: list[tuple[Path, int, int]] = []
+    for src in sorted(log_dir.glob("router-decisions-*.jsonl")):
+        day = src.name[len("router-decisions-"):-len(".jsonl")]
+        if day in keep:
+            continue
+        dst = src.with_name(f"{src.name}.{fmt}")
+        st = src.stat()
+        cached = read_day_cache(cache_dir, src) if cache_dir else None
+        indexed = read_session_index(index_dir, src) if index_dir else None
+        compress_file(src, dst, fmt, level)
+        if cached and (cached["ino"], cached["size"], cached["mtime_ns"], cached["offset"]) == (
+            st.st_ino, st.st_size, st.st_mtime_ns, st.st_size
+        ):
+            agg = RouterSummary.from_state(cached["state"])
+            write_day_cache(cache_dir, dst, day_cache_payload(dst.stat(), st.st_size, agg))
+        if indexed and (indexed["ino"], indexed["size"], indexed["mtime_ns"], indexed["offset"]) == (
+            st.st_ino, st.st_size, st.st_mtime_ns, st.st_size
+        ):
+            # Decompressed offsets match the plain file, so the index carries over.
+            dst_st = dst.stat()
+            indexed.update(ino=dst_st.st_ino, size=dst_st.st_size, mtime_ns=dst_st.st_mtime_ns)
+            offsets = _read_array(index_dir / f"{src.name}.sessions.u64", "Q")
+            write_session_index(index_dir, dst, indexed, array.array("Q", offsets))
+        src.unlink()
+        if cache_dir:
+            (cache_dir / f"{src.name}.summary.json").unlink(missing_ok=True)
+        if index_dir:
+            (index_dir / f"{src.name}.sessions.json").unlink(missing_ok=True)
+            (index_dir / f"{src.name}.sessions.u64").unlink(missing_ok=True)
+        done.append((dst, st.st_size, dst.stat().st_size))
+    return done
+
+
+# ── Columnar archive ─────────────────────────────────────────
+#
+# router-decisions-YYYY-MM-DD.cols/ holds one sealed day as columns:
+#   meta.json          row count and the dictionary of every string column
+#   <field>.u32        dictionary codes (0 = key absent) for DICT_COLUMNS
+#   <field>.f64        safe_num() values, NaN when absent or non-numeric
+#   <field>.u8         truthiness of BOOL_COLUMNS
+# All binary columns are little-endian. Dictionaries hold the raw JSON
+# values, so filters and labels are resolved once per distinct value and
+# the per-row work is array indexing. Without NumPy the archive is replayed
+# through RouterSummary.add() instead.
+
+# Version 2: responseStatusCode became a column, and version 1 archives
+# built under msgspec before its decoder kept every field lack it too. Any
+# other version counts as no archive, so the day is read from its JSONL and
+# `compact --columnar` rebuilds it.
+COLUMNAR_VERSION = 2
+DICT_COLUMNS = ("event", "sessionKey", "taskType", "finalModel", "selectedModel", "modelSource")
+NUM_COLUMNS = ("ts", "responseTimeMs", "toolGateRetryCount", "responseStatusCode")
+BOOL_COLUMNS = ("toolGateActive", "toolGateEscalated", "toolGateHadValidToolCalls")
+_ABSENT = object()
+
+
+def columnar_dir(log_dir: Path, day: str) -> Path | None:
+    """The day's columnar archive, or None when it is missing or another version."""
+    p = log_dir / f"router-decisions-{day}.cols"
+    try:
+        meta = json.loads((p / "meta.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return p if meta.get("version") == COLUMNAR_VERSION else None
+
+
+def _write_array(path: Path, arr: array.array) -> None:
+    if sys.byteorder == "big":
+        arr.byteswap()
+    with path.open("wb") as f:
+        arr.tofile(f)
+
+
+def _read_array(path: Path, typecode: str) -> Any:
+    if np is not None:
+        dtype = {"I": "<u4", "Q": "<u8", "d": "<f8", "B": "u1"}[typecode]
+        return np.fromfile(path, dtype=dtype)
+    arr = array.array(typecode)
+    arr.frombytes(path.read_bytes())
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+def write_columnar_day(src: Path, out_dir: Path, decoder: str = "auto") -> int:
+    """Encode one day file as a columnar archive; returns the row count."""
+    codes = {name: array.array("I") for name in DICT_COLUMNS}
+    values: dict[str, list[Any]] = {name: [None] for name in DICT_COLUMNS}
+    index: dict[str, dict[str, int]] = {name: {} for name in DICT_COLUMNS}
+    nums = {name: array.array("d") for name in NUM_COLUMNS}
+    bools = {name: array.array("B") for name in BOOL_COLUMNS}
+    rows = 0
+    with open_day_file(src) as f:
+        for rec in iter_records(f, get_decoder(decoder)):
+            rows += 1
+            for name in DICT_COLUMNS:
+                v = rec.get(name, _ABSENT)
+                if v is _ABSENT:
+                    codes[name].append(0)
+                    continue
+                key = json.dumps(v, sort_keys=True)
+                code = index[name].get(key)
+                if code is None:
+                    code = index[name][key] = len(values[name])
+                    values[name].append(v)
+                codes[name].append(code)
+            for name in NUM_COLUMNS:
+                n = safe_num(rec.get(name))
+                nums[name].append(math.nan if n is None else n)
+            for name in BOOL_COLUMNS:
+                bools[name].append(1 if rec.get(name) else 0)
+
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name in DICT_COLUMNS:
+        _write_array(tmp / f"{name}.u32", codes[name])
+    for name in NUM_COLUMNS:
+        _write_array(tmp / f"{name}.f64", nums[name])
+    for name in BOOL_COLUMNS:
+        _write_array(tmp / f"{name}.u8", bools[name])
+    meta = {"version": COLUMNAR_VERSION, "source": src.name, "rows": rows, "dictionaries": values}
+    (tmp / "meta.json").write_text(json.dumps(meta, separators=(",", ":")), encoding="utf-8")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+    return rows
+
+
+def read_columnar_day(cols_dir: Path) -> tuple[dict[str, Any], dict[str, Any]]:
+    meta = json.loads((cols_dir / "meta.json").read_text(encoding="utf-8"))
+    if meta.get("version") != COLUMNAR_VERSION:
+        raise ValueError(f"unsupported columnar archive version in {cols_dir}")
+    cols: dict[str, Any] = {}
+    for name in DICT_COLUMNS:
+        cols[name] = _read_array(cols_dir / f"{name}.u32", "I")
+    for name in NUM_COLUMNS:
+        cols[name] = _read_array(cols_dir / f"{name}.f64", "d")
+    for name in BOOL_COLUMNS:
+        cols[name] = _read_array(cols_dir / f"{name}.u8", "B")
+    return meta, cols
+
+
+def build_columnar_archives(log_dir: Path, keep_days: int, decoder: str = "auto") -> list[tuple[Path, int]]:
+    keep = set(days_in_window(keep_days)) if keep_days > 0 else set()
+    built: list[tuple[Path, int]] = []
+    days = sorted({p.name[len("router-decisions-"):].split(".", 1)[0] for p in log_dir.glob("router-decisions-*.jsonl*")})
+    for day in days:
+        if day in keep or columnar_dir(log_dir, day) is not None:
+            continue
+        src = day_file(log_dir, day)
+        if src is None:
+            continue
+        out_dir = log_dir / f"router-decisions-{day}.cols"
+        built.append((out_dir, write_columnar_day(src, out_dir, decoder)))
+    return built
+
+
+def _column_labels(values: list[Any], default: str, label: Callable[[Any], str | None] = str) -> tuple[Any, list[str]]:
+    """Map dictionary codes to deduplicated string labels; label() -> None maps to -1."""
+    labels: list[str] = []
+    seen: dict[str, int] = {}
+    mapping: list[int] = []
+    for code, v in enumerate(values):
+        text = default if code == 0 else label(v)
+        if text is None:
+            mapping.append(-1)
+            continue
+        idx = seen.get(text)
+        if idx is None:
+            idx = seen[text] = len(labels)
+            labels.append(text)
+        mapping.append(idx)
+    return np.array(mapping, dtype=np.int64), labels
+
+
+def _ordered_counts(codes: Any, labels: list[str]) -> Counter:
+    """Counter over label codes, keyed in first-occurrence order like the row path."""
+    if not len(codes):
+        return Counter()
+    uniq, first = np.unique(codes, return_index=True)
+    counts = np.bincount(codes, minlength=len(labels))
+    return Counter({labels[c]: int(counts[c]) for c in uniq[np.argsort(first, kind="stable")]})
+
+
+def _sketch_from_values(values: Any) -> LatencySketch:
+    sketch = LatencySketch()
+    values = values[np.isfinite(values)]
+    if not len(values):
+        return sketch
+    sketch.count = int(len(values))
+    sketch.min = float(values.min())
+    sketch.max = float(values.max())
+    pos = values[values > 0]
+    sketch.zero_count = sketch.count - int(len(pos))
+    if len(pos):
+        ks = np.ceil(np.log(pos) / LatencySketch.LOG_GAMMA).astype(np.int64)
+        uniq, counts = np.unique(ks, return_counts=True)
+        sketch.buckets = dict(zip(uniq.tolist(), counts.tolist()))
+    return sketch
+
+
+def _replay_columns(
+    meta: dict[str, Any],
+    cols: dict[str, Any],
+    session: str,
+    model: str,
+    options: SummaryOptions | None = None,
+) -> RouterSummary:
+    """Pure-Python path: rebuild the fields RouterSummary reads and add() them."""
+    agg = RouterSummary(options)
+    dicts = meta["dictionaries"]
+    for i in range(meta["rows"]):
+        rec: dict[str, Any] = {}
+        for name in DICT_COLUMNS:
+            code = cols[name][i]
+            if code:
+                rec[name] = dicts[name][code]
+        for name in NUM_COLUMNS:
+            v = cols[name][i]
+            if v == v:
+                rec[name] = v
+        for name in BOOL_COLUMNS:
+            rec[name] = bool(cols[name][i])
+        matched = apply_filters((rec,), session, model)
+        if agg.options.time_bounded:
+            matched = apply_time_range(matched, agg.options.since_ms, agg.options.until_ms)
+        for e in matched:
+            agg.add(e)
+    return agg
+
+
+def summarize_columnar(
+    cols_dir: Path,
+    session: str = "",
+    model: str = "",
+    options: SummaryOptions | None = None,
+) -> RouterSummary:
+    meta, cols = read_columnar_day(cols_dir)
+    options = options or SummaryOptions()
+    if np is None or options.extended_rows:
+        # The optional sections are only implemented row-wise.
+        return _replay_columns(meta, cols, session, model, options)
+
+    dicts = meta["dictionaries"]
+    agg = RouterSummary(options)
+    mask = np.ones(meta["rows"], dtype=bool)
+    if options.time_bounded:
+        ts = cols["ts"]
+        if options.since_ms is not None:
+            mask &= ts >= options.since_ms
+        if options.until_ms is not None:
+            mask &= ts < options.until_ms
+    if session:
+        hit = np.array([code > 0 and str(v) == session for code, v in enumerate(dicts["sessionKey"])])
+        mask &= hit[cols["sessionKey"]]
+    if model:
+        needle = model.lower()
+        hit = np.array([needle in ("" if code == 0 else str(v)).lower() for code, v in enumerate(dicts["finalModel"])])
+        mask &= hit[cols["finalModel"]]
+    agg.total = int(mask.sum())
+
+    is_chat = np.array([code > 0 and v == "chat_completion" for code, v in enumerate(dicts["event"])])
+    rows = np.flatnonzero(mask & is_chat[cols["event"]])
+    agg.chat_total = int(len(rows))
+    if not agg.chat_total:
+        return agg
+
+    # str(finalModel or selectedModel or "unknown"), resolved per dictionary entry.
+    model_labels: list[str] = []
+    model_index: dict[str, int] = {}
+
+    def model_code(v: Any) -> int:
+        text = str(v)
+        if text not in model_index:
+            model_index[text] = len(model_labels)
+            model_labels.append(text)
+        return model_index[text]
+
+    final_map = np.array([model_code(v) if code and v else -1 for code, v in enumerate(dicts["finalModel"])], dtype=np.int64)
+    selected_map = np.array([model_code(v) if code and v else -1 for code, v in enumerate(dicts["selectedModel"])], dtype=np.int64)
+    unknown = model_code("unknown")
+    model_codes = final_map[cols["finalModel"][rows]]
+    fallback = model_codes < 0
+    model_codes[fallback] = selected_map[cols["selectedModel"][rows][fallback]]
+    model_codes[model_codes < 0] = unknown
+
+    task_map, task_labels = _column_labels(dicts["taskType"], "unknown")
+    source_map, source_labels = _column_labels(dicts["modelSource"], "unknown")
+    session_map, session_labels = _column_labels(dicts["sessionKey"], "unknown")
+    task_codes = task_map[cols["taskType"][rows]]
+
+    agg.model_counts = _ordered_counts(model_codes, model_labels)
+    agg.source_counts = _ordered_counts(source_map[cols["modelSource"][rows]], source_labels)
+    agg.task_counts = _ordered_counts(task_codes, task_labels)
+    agg.session_counts = _ordered_counts(session_map[cols["sessionKey"][rows]], session_labels)
+
+    pairs = task_codes * len(model_labels) + model_codes
+    uniq, first, counts = np.unique(pairs, return_index=True, return_counts=True)
+    for pos in np.argsort(first, kind="stable"):
+        t, m = divmod(int(uniq[pos]), len(model_labels))
+        agg.model_by_task[task_labels[t]][model_labels[m]] = int(counts[pos])
+
+    agg.escalation_total = int(cols["toolGateEscalated"][rows].sum())
+    agg.tool_gate_total = int(cols["toolGateActive"][rows].sum())
+    agg.tool_gate_success_total = int(cols["toolGateHadValidToolCalls"][rows].sum())
+
+    retries = cols["toolGateRetryCount"][rows]
+    retries = retries[~np.isnan(retries)]
+    agg.retry_sum = float(retries.sum())
+    agg.retry_n = int(len(retries))
+
+    latency = cols["responseTimeMs"][rows]
+    valid = ~np.isnan(latency)
+    latency = latency[valid]
+    agg.latency_sum = float(latency.sum())
+    agg.latency_n = int(len(latency))
+    agg.latency_sketch = _sketch_from_values(latency)
+    lat_models = model_codes[valid]
+    lat_tasks = task_codes[valid]
+    if len(latency):
+        sums = np.bincount(lat_models, weights=latency, minlength=len(model_labels))
+        ns = np.bincount(lat_models, minlength=len(model_labels))
+        uniq, first = np.unique(lat_models, return_index=True)
+        for m in uniq[np.argsort(first, kind="stable")]:
+            label = model_labels[m]
+            agg.latency_by_model[label] = [float(sums[m]), int(ns[m])]
+            agg.latency_sketch_by_model[label] = _sketch_from_values(latency[lat_models == m])
+        uniq, first = np.unique(lat_tasks, return_index=True)
+        for t in uniq[np.argsort(first, kind="stable")]:
+            agg.latency_sketch_by_task[task_labels[t]] = _sketch_from_values(latency[lat_tasks == t])
+    return agg
+
+
+# ── Parallel parsing ─────────────────────────────────────────
+#
+# Workers return RouterSummary partials rather than records, and partials
+# are merged in file order, so --workers N reports exactly what the serial
+# path does.
+
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+
+
+def split_ranges(
+    path: Path,
+    parts: int,
+    since_ms: int | None = None,
+    until_ms: int | None = None,
+) -> list[tuple[int, int | None]]:
+    if is_compressed(path):
+        # A compressed stream cannot be entered mid-way: one job reads it all.
+        return [(0, None)]
+    lo, hi = 0, path.stat().st_size
+    if since_ms is not None or until_ms is not None:
+        lo, hi = seek_time_range(path, since_ms, until_ms)
+    step = max(MIN_RANGE_BYTES, -(-(hi - lo) // max(1, parts)))
+    return [(start, min(start + step, hi)) for start in range(lo, hi, step)] or [(lo, lo)]
+
+
+# Records are appended in ts order, but concurrent requests can finish a
+# little out of order; seek this far past each bound and filter exactly.
+SEEK_SLACK_MS = 60_000
+# Below this many bytes a linear scan beats further probing.
+SEEK_LINEAR_BYTES = 64 * 1024
+
+
+def _probe_ts(f: BinaryIO, pos: int, hi: int) -> tuple[int, float | None]:
+    """Return the first line start >= pos and the first ts found from there before hi."""
+    if pos:
+        f.seek(pos - 1)
+        f.readline()
+    else:
+        f.seek(0)
+    start = f.tell()
+    at = start
+    while at < hi:
+        line = f.readline()
+        if not line:
+            break
+        at += len(line)
+        rec = decode_stdlib(line)
+        ts = safe_num(rec.get("ts")) if isinstance(rec, dict) else None
+        if ts is not None and math.isfinite(ts):
+            return start, ts
+    return start, None
+
+
+def seek_ts(f: BinaryIO, size: int, target_ms: float) -> int:
+    """
+    Offset of the first line with ts >= target_ms in a ts-ordered file (size
+    if none): binary search over line starts, then a short linear scan.
+    """
+    lo, hi = 0, size
+    while hi - lo > SEEK_LINEAR_BYTES:
+        mid = (lo + hi) // 2
+        start, ts = _probe_ts(f, mid, hi)
+        if start < hi and ts is not None and ts < target_ms:
+            lo = start
+        else:
+            hi = mid
+    f.seek(lo)
+    pos = lo
+    for line in f:
+        rec = decode_stdlib(line)
+        ts = safe_num(rec.get("ts")) if isinstance(rec, dict) else None
+        if ts is not None and ts >= target_ms:
+            return pos
+        pos += len(line)
+    return size
+
+
+def seek_time_range(path: Path, since_ms: int | None, until_ms: int | None) -> tuple[int, int]:
+    """Byte range of a plain day file that can hold records in [since_ms, until_ms)."""
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        lo = seek_ts(f, size, since_ms - SEEK_SLACK_MS) if since_ms is not None else 0
+        hi = seek_ts(f, size, until_ms + SEEK_SLACK_MS) if until_ms is not None else size
+    return lo, max(lo, hi)
+
+
+def iter_range_lines(f: BinaryIO, start: int, end: int | None) -> Iterator[bytes]:
+    """Yield the lines of a binary file that begin inside [start, end); end=None reads to EOF."""
+    if end is None:
+        yield from f
+        return
+    if start:
+        # Land on the first line boundary at or after `start`; the line
+        # straddling it belongs to the previous range.
+        f.seek(start - 1)
+        f.readline()
+    pos = f.tell()
+    while pos < end:
+        line = f.readline()
+        if not line:
+            break
+        pos += len(line)
+        yield line
+
+
+def summarize_range(
+    path: Path,
+    start: int,
+    end: int | None,
+    session: str,
+    model: str,
+    decoder: str = "auto",
+    options: SummaryOptions | None = None,
+) -> RouterSummary:
+    agg = RouterSummary(options)
+    with open_day_file(path) as f:
+        lines = iter_range_lines(f, start, end)
+        records = iter_records(lines, get_decoder(decoder), make_line_prefilter(session, model))
+        if agg.options.time_bounded:
+            records = apply_time_range(records, agg.options.since_ms, agg.options.until_ms)
+        for rec in apply_filters(records, session, model):
+            agg.add(rec)
+    return agg
+
+
+def run_jobs(
+    jobs: list[tuple[Callable[..., Any], tuple[Any, ...]]],
+    workers: int,
+) -> Iterator[Any]:
+    if workers <= 1 or len(jobs) <= 1:
+        for fn, fn_args in jobs:
+            yield fn(*fn_args)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+        futures = [ex.submit(fn, *fn_args) for fn, fn_args in jobs]
+        for fut in futures:
+            yield fut.result()
+
+
+def summarize_window(
+    log_dir: Path,
+    days: int,
+    cache_dir: Path | None,
+    session: str = "",
+    model: str = "",
+    workers: int = 1,
+    decoder: str = "auto",
+    columnar: bool = True,
+    options: SummaryOptions | None = None,
+    day_offset: int = 0,
+    index_dir: Path | None = None,
+) -> RouterSummary:
+    """
+    Summarize the window day by day. A --session query with an index_dir
+    reads only that session's lines through the session index. Otherwise
+    days with a columnar archive are reduced from their columns; the rest go
+    through the summary cache (unfiltered, default-option runs only) or are
+    parsed in newline-aligned byte ranges. A --since window replaces --days
+    and seeks each plain day file to the bytes that can hold it.
+    """
+    options = options or SummaryOptions()
+    if options.since_ms is not None:
+        window = days_in_range(options.since_ms, options.until_ms)
+    else:
+        window = days_in_window(days, day_offset)
+    jobs: list[tuple[Callable[..., RouterSummary], tuple[Any, ...]]] = []
+    for day in window:
+        p = day_file(log_dir, day) if session and index_dir else None
+        if p is not None:
+            jobs.append((summarize_session_day, (p, index_dir, session, model, decoder, options)))
+            continue
+        cols = columnar_dir(log_dir, day) if columnar else None
+        if cols is not None:
+            jobs.append((summarize_columnar, (cols, session, model, options)))
+            continue
+        p = day_file(log_dir, day)
+        if p is None:
+            continue
+        if cache_dir:
+            # Cached partials are unfiltered plain summaries; callers only pass a
+            # cache_dir without filters or extended options.
+            jobs.append((summarize_day, (p, cache_dir, decoder)))
+            continue
+        for start, end in split_ranges(p, workers, options.since_ms, options.until_ms):
+            jobs.append((summarize_range, (p, start, end, session, model, decoder, options)))
+    agg = RouterSummary(options)
+    for part in run_jobs(jobs, workers):
+        agg.merge(part)
+    return agg
+
+
+# ── Ad-hoc queries ───────────────────────────────────────────
+#
+# --group-by/--metrics/--where run one streaming pass with a hash table of
+# groups. Every metric keeps constant-size state (sums, extremes, a latency
+# sketch), and past --max-groups new groups fold into one "(other)" row, so
+# memory is bounded by groups x metrics regardless of the window.
+
+METRIC_RE = re.compile(r"^(count|sum|avg|min|max|rate|p\d+(?:\.\d+)?)(?:\((\w+)\))?$")
+WHERE_RE = re.compile(r"^(\w+)\s*(!=|>=|<=|=|~|>|<)\s*(.*)$")
+OTHER_GROUP = "(other)"
+
+
+def parse_metrics(text: str) -> list[tuple[str, str, str]]:
+    """'count,p95(responseTimeMs)' -> [(label, kind, field), ...]."""
+    out = []
+    for item in (m.strip() for m in text.split(",")):
+        if not item:
+            continue
+        match = METRIC_RE.match(item)
+        if not match:
+            raise ValueError(f"--metrics: cannot parse {item!r}")
+        kind, field = match.group(1), match.group(2) or ""
+        if (kind == "count") != (not field):
+            raise ValueError(f"--metrics: {kind} {'takes no field' if kind == 'count' else 'needs a field'}")
+        if kind.startswith("p") and not 0 < float(kind[1:]) < 100:
+            raise ValueError(f"--metrics: percentile out of range in {item!r}")
+        out.append((item, kind, field))
+    if not out:
+        raise ValueError("--metrics: nothing to compute")
+    return out
+
+
+def parse_where(text: str) -> tuple[str, str, str]:
+    match = WHERE_RE.match(text.strip())
+    if not match:
+        raise ValueError(f"--where: cannot parse {text!r} (expected e.g. taskType=coding)")
+    field, op, value = match.groups()
+    if op in (">", ">=", "<", "<=") and safe_num(value) is None:
+        raise ValueError(f"--where: {op} needs a number, got {value!r}")
+    return field, op, value
+
+
+def field_text(v: Any) -> str:
+    """Render a field value the way it reads in the JSON log."""
+    if v is None:
+        return "null"
+    if isinstance(v, bool):
+        return "true" if v else "false"
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+class GroupQuery:
+    """Hash aggregation for --group-by; mergeable like RouterSummary."""
+
+    def __init__(
+        self,
+        group_by: list[str],
+        metrics: list[tuple[str, str, str]],
+        where: list[tuple[str, str, str]],
+        max_groups: int = 10000,
+    ) -> None:
+        self.group_by = group_by
+        self.metrics = metrics
+        self.where = where
+        self.max_groups = max(1, max_groups)
+        # group key -> [count, per-metric state...]
+        self.groups: dict[tuple[str, ...], list[Any]] = {}
+
+    def empty(self) -> "GroupQuery":
+        return GroupQuery(self.group_by, self.metrics, self.where, self.max_groups)
+
+    def matches(self, e: dict[str, Any]) -> bool:
+        for field, op, value in self.where:
+            v = e.get(field)
+            if op == "=":
+                ok = field_text(v) == value
+            elif op == "!=":
+                ok = field_text(v) != value
+            elif op == "~":
+                ok = v is not None and value.lower() in field_text(v).lower()
+            else:
+                n, bound = safe_num(v), float(value)
+                ok = n is not None and (
+                    n > bound if op == ">" else n >= bound if op == ">=" else n < bound if op == "<" else n <= bound
+                )
+            if not ok:
+                return False
+        return True
+
+    def _new_state(self) -> list[Any]:
+        state: list[Any] = [0]
+        for _, kind, _ in self.metrics:
+            if kind in ("sum", "avg", "rate"):
+                state.append([0.0, 0])
+            elif kind in ("min", "max"):
+                state.append(None)
+            elif kind.startswith("p"):
+                state.append(LatencySketch())
+            else:
+                state.append(None)
+        return state
+
+    def _slot(self, key: tuple[str, ...]) -> list[Any]:
+        state = self.groups.get(key)
+        if state is None:
+            if len(self.groups) >= self.max_groups:
+                key = (OTHER_GROUP,) * len(self.group_by)
+                state = self.groups.get(key)
+            if state is None:
+                state = self.groups[key] = self._new_state()
+        return state
+
+    def add(self, e: dict[str, Any]) -> None:
+        if self.where and not self.matches(e):
+            return
+        state = self._slot(tuple(field_text(e.get(f)) for f in self.group_by))
+        state[0] += 1
+        for i, (_, kind, field) in enumerate(self.metrics, 1):
+            if kind == "count":
+                continue
+            v = e.get(field)
+            if kind == "rate":
+                state[i][0] += 1 if v else 0
+                state[i][1] += 1
+                continue
+            n = safe_num(v) if not isinstance(v, bool) else float(v)
+            if n is None or not math.isfinite(n):
+                continue
+            if kind in ("sum", "avg"):
+                state[i][0] += n
+                state[i][1] += 1
+            elif kind == "min":
+                state[i] = n if state[i] is None else min(state[i], n)
+            elif kind == "max":
+                state[i] = n if state[i] is None else max(state[i], n)
+            else:
+                state[i].add(n)
+
+    def merge(self, other: "GroupQuery") -> "GroupQuery":
+        for key, theirs in other.groups.items():
+            state = self._slot(key)
+            state[0] += theirs[0]
+            for i, (_, kind, _) in enumerate(self.metrics, 1):
+                if kind == "count" or theirs[i] is None:
+                    continue
+                if kind in ("sum", "avg", "rate"):
+                    state[i][0] += theirs[i][0]
+                    state[i][1] += theirs[i][1]
+                elif kind == "min":
+                    state[i] = theirs[i] if state[i] is None else min(state[i], theirs[i])
+                elif kind == "max":
+                    state[i] = theirs[i] if state[i] is None else max(state[i], theirs[i])
+                else:
+                    state[i].merge(theirs[i])
+        return self
+
+    def to_report(self) -> dict[str, Any]:
+        rows = []
+        for key, state in self.groups.items():
+            row: dict[str, Any] = dict(zip(self.group_by, key))
+            for i, (label, kind, _) in enumerate(self.metrics, 1):
+                if kind == "count":
+                    row[label] = state[0]
+                elif kind == "sum":
+                    row[label] = round(state[i][0], 2)
+                elif kind == "avg":
+                    row[label] = round(state[i][0] / state[i][1], 2) if state[i][1] else None
+                elif kind == "rate":
+                    row[label] = round(state[i][0] / state[i][1], 4) if state[i][1] else None
+                elif kind in ("min", "max"):
+                    row[label] = state[i]
+                else:
+                    sketch = state[i]
+                    row[label] = round(sketch.quantile(float(kind[1:]) / 100), 2) if sketch.count else None
+            rows.append((state[0], key, row))
+        rows.sort(key=lambda item: (-item[0], item[1]))
+        return {
+            "group_by": self.group_by,
+            "metrics": [label for label, _, _ in self.metrics],
+            "where": [f"{f}{op}{v}" for f, op, v in self.where],
+            "groups": len(rows),
+            "rows": [row for _, _, row in rows],
+        }
+
+
+def query_range(
+    path: Path,
+    start: int,
+    end: int | None,
+    query: GroupQuery,
+    session: str,
+    model: str,
+    decoder: str = "auto",
+    options: SummaryOptions | None = None,
+) -> GroupQuery:
+    part = query.empty()
+    options = options or SummaryOptions()
+    with open_day_file(path) as f:
+        records = iter_records(iter_range_lines(f, start, end), get_decoder(decoder), make_line_prefilter(session, model))
+        if options.time_bounded:
+            records = apply_time_range(records, options.since_ms, options.until_ms)
+        for rec in apply_filters(records, session, model):
+            part.add(rec)
+    return part
+
+
+def query_window(
+    log_dir: Path,
+    days: int,
+    query: GroupQuery,
+    session: str = "",
+    model: str = "",
+    workers: int = 1,
+    decoder: str = "auto",
+    options: SummaryOptions | None = None,
+) -> GroupQuery:
+    """Run a query over the JSONL/archive day files (any field, so no columnar path)."""
+    options = options or SummaryOptions()
+    if options.since_ms is not None:
+        window = days_in_range(options.since_ms, options.until_ms)
+    else:
+        window = days_in_window(days)
+    jobs: list[tuple[Callable[..., Any], tuple[Any, ...]]] = []
+    for day in window:
+        p = day_file(log_dir, day)
+        if p is None:
+            continue
+        for start, end in split_ranges(p, workers, options.since_ms, options.until_ms):
+            jobs.append((query_range, (p, start, end, query, session, model, decoder, options)))
+    result = query.empty()
+    for part in run_jobs(jobs, workers):
+        result.merge(part)
+    return result
+
+
+def render_query_markdown(report: dict[str, Any]) -> str:
+    columns = [*report["group_by"], *report["metrics"]]
+    lines = ["# Router Decision Query", ""]
+    if report["where"]:
+        lines.append(f"- Where: {' and '.join(report['where'])}")
+    lines.append(f"- Groups: {report['groups']}")
+    lines.append("")
+    lines.append("| " + " | ".join(columns) + " |")
+    lines.append("|" + "---|" * len(columns))
+    for row in report["rows"]:
+        lines.append("| " + " | ".join("" if row[c] is None else str(row[c]) for c in columns) + " |")
+    lines.append("")
+    return "\n".join(lines)
+
+
+# ── SQLite backend ───────────────────────────────────────────
+#
+# `ingest` appends every new complete line to a `decisions` table and keeps
+# the ingested byte offset per day in `files`, like the summary cache does.
+# Columns hold the values RouterSummary derives (model, latency bucket, ...)
+# so `--db` reports are GROUP BY queries whose results fill a RouterSummary
+# and render through the same to_report(). Non-finite numbers are stored as
+# NULL. WAL mode lets cron ingest while others read.
+
+# Version 2: databases ingested under msgspec before its decoder kept every
+# field have NULL status codes, tool counts and message sizes; refuse them.
+DB_SCHEMA_VERSION = 2
+DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS files (
+    day TEXT PRIMARY KEY, source TEXT, ino INTEGER, size INTEGER, mtime_ns INTEGER, offset INTEGER
+);
+CREATE TABLE IF NOT EXISTS decisions (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    ts,
+    event TEXT,
+    sessionKey TEXT,
+    taskType TEXT,
+    modelSource TEXT,
+    selectedModel TEXT,
+    finalModel TEXT,
+    model TEXT NOT NULL,
+    toolGateActive INTEGER NOT NULL,
+    toolGateRetryCount,
+    toolGateEscalated INTEGER NOT NULL,
+    toolGateHadValidToolCalls INTEGER NOT NULL,
+    responseStatusCode,
+    responseTimeMs,
+    latencyBucket INTEGER,
+    toolsCount,
+    userMessageChars
+);
+CREATE INDEX IF NOT EXISTS decisions_day ON decisions (day);
+CREATE INDEX IF NOT EXISTS decisions_ts ON decisions (ts);
+CREATE INDEX IF NOT EXISTS decisions_session ON decisions (sessionKey);
+CREATE INDEX IF NOT EXISTS decisions_final_model ON decisions (finalModel);
+CREATE INDEX IF NOT EXISTS decisions_task ON decisions (taskType);
+"""
+DB_INSERT = (
+    "INSERT INTO decisions (day, ts, event, sessionKey, taskType, modelSource, selectedModel, finalModel, model, "
+    "toolGateActive, toolGateRetryCount, toolGateEscalated, toolGateHadValidToolCalls, responseStatusCode, "
+    "responseTimeMs, latencyBucket, toolsCount, userMessageChars) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+DB_BATCH = 5000
+
+
+def default_db_path(log_dir: Path) -> Path:
+    return log_dir / "router-decisions.sqlite3"
+
+
+def open_db(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(DB_SCHEMA)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+    if row is None:
+        with conn:
+            conn.execute("INSERT INTO meta VALUES ('schema_version', ?)", (str(DB_SCHEMA_VERSION),))
+    elif row[0] != str(DB_SCHEMA_VERSION):
+        conn.close()
+        raise SystemExit(f"{db_path}: schema version {row[0]}, expected {DB_SCHEMA_VERSION}; delete it and re-run ingest")
+    conn.create_function("py_lower", 1, lambda v: v.lower() if isinstance(v, str) else v, deterministic=True)
+    return conn
+
+
+def _db_text(e: dict[str, Any], key: str) -> str | None:
+    """str() of the field as RouterSummary keys it, NULL when the key is absent."""
+    return str(e[key]) if key in e else None
+
+
+def _db_num(v: Any) -> float | None:
+    if isinstance(v, (int, float)) and not isinstance(v, bool):
+        return v if math.isfinite(v) else None
+    n = safe_num(v)
+    return n if n is not None and math.isfinite(n) else None
+
+
+def db_row(day: str, e: dict[str, Any]) -> tuple[Any, ...]:
+    rt = _db_num(e.get("responseTimeMs"))
+    return (
+        day,
+        _db_num(e.get("ts")),
+        _db_text(e, "event"),
+        _db_text(e, "sessionKey"),
+        _db_text(e, "taskType"),
+        _db_text(e, "modelSource"),
+        _db_text(e, "selectedModel"),
+        _db_text(e, "finalModel"),
+        str(e.get("finalModel") or e.get("selectedModel") or "unknown"),
+        1 if e.get("toolGateActive") else 0,
+        _db_num(e.get("toolGateRetryCount")),
+        1 if e.get("toolGateEscalated") else 0,
+        1 if e.get("toolGateHadValidToolCalls") else 0,
+        _db_num(e.get("responseStatusCode")),
+        rt,
+        LatencySketch.bucket_of(rt) if rt is not None else None,
+        _db_num(e.get("toolsCount")),
+        _db_num(e.get("userMessageChars")),
+    )
+
+
+def _skip_bytes(f: BinaryIO, n: int) -> None:
+    while n > 0:
+        chunk = f.read(min(n, 1024 * 1024))
+        if not chunk:
+            break
+        n -= len(chunk)
+
+
+def ingest_day(conn: sqlite3.Connection, path: Path, decoder: str = "auto") -> int:
+    """Ingest the lines of one day file not in the database yet; returns rows added."""
+    day = path.name[len("router-decisions-"):].split(".", 1)[0]
+    st = path.stat()
+    known = conn.execute("SELECT source, ino, size, mtime_ns, offset FROM files WHERE day = ?", (day,)).fetchone()
+    start = None
+    if known is not None:
+        source, ino, size, mtime_ns, offset = known
+        if source == path.name and is_compressed(path):
+            if (ino, size, mtime_ns) == (st.st_ino, st.st_size, st.st_mtime_ns):
+                return 0
+        elif source == path.name:
+            rewritten = size == st.st_size and mtime_ns != st.st_mtime_ns
+            if ino == st.st_ino and offset <= st.st_size and not rewritten:
+                if offset == st.st_size:
+                    return 0
+                start = offset
+        elif is_compressed(path) and path.name.startswith(source + "."):
+            # Compacted since the last ingest: the archive holds the same
+            # bytes, so carry on from the same offset in the decompressed stream.
+            start = offset
+
+    decode = get_decoder(decoder)
+    added = 0
+    offset = start or 0
+    with conn, open_day_file(path) as f:
+        if start is None:
+            conn.execute("DELETE FROM decisions WHERE day = ?", (day,))
+        elif is_compressed(path):
+            _skip_bytes(f, start)
+        else:
+            f.seek(start)
+        batch: list[tuple[Any, ...]] = []
+        for line in f:
+            if not line.endswith(b"\n") and not is_compressed(path):
+                # A write in progress: picked up by the next ingest.
+                break
+            offset += len(line)
+            raw = line.strip()
+            rec = decode(raw) if raw else None
+            if rec is None:
+                continue
+            batch.append(db_row(day, rec))
+            if len(batch) >= DB_BATCH:
+                conn.executemany(DB_INSERT, batch)
+                added += len(batch)
+                batch.clear()
+        conn.executemany(DB_INSERT, batch)
+        added += len(batch)
+        conn.execute(
+            "INSERT OR REPLACE INTO files (day, source, ino, size, mtime_ns, offset) VALUES (?, ?, ?, ?, ?, ?)",
+            (day, path.name, st.st_ino, st.st_size, st.st_mtime_ns, offset),
+        )
+    return added
+
+
+def ingest_logs(log_dir: Path, db_path: Path, decoder: str = "auto") -> list[tuple[str, int]]:
+    days = sorted({
+        p.name[len("router-decisions-"):].split(".", 1)[0]
+        for suffix in DAY_FILE_SUFFIXES
+        for p in log_dir.glob(f"router-decisions-*{suffix}")
+    })
+    conn = open_db(db_path)
+    try:
+        done = []
+        for day in days:
+            path = day_file(log_dir, day)
+            if path is not None:
+                done.append((path.name, ingest_day(conn, path, decoder)))
+        return done
+    finally:
+        conn.close()
+
+
+def _first_seen(rows: Iterable[tuple[Any, ...]], day_rank: dict[str, int]) -> dict[Any, list[Any]]:
+    """
+    Merge (key, day, first_id, values...) group rows into key -> summed values,
+    ordered by where each key first appears when days are read newest first
+    and lines in file order, the order Counter insertion has in a streaming run.
+    """
+    firsts: dict[Any, tuple[int, int]] = {}
+    sums: dict[Any, list[Any]] = {}
+    for key, day, first_id, *values in rows:
+        at = (day_rank[day], first_id)
+        if key not in firsts or at < firsts[key]:
+            firsts[key] = at
+        acc = sums.get(key)
+        if acc is None:
+            sums[key] = list(values)
+        else:
+            for i, v in enumerate(values):
+                acc[i] += v
+    return {key: sums[key] for key in sorted(firsts, key=firsts.__getitem__)}
+
+
+def summarize_db(
+    db_path: Path,
+    days: int,
+    session: str = "",
+    model: str = "",
+    options: SummaryOptions | None = None,
+    day_offset: int = 0,
+) -> RouterSummary:
+    """Build the RouterSummary for a window from GROUP BY queries."""
+    options = options or SummaryOptions()
+    if options.since_ms is not None:
+        window = days_in_range(options.since_ms, options.until_ms)
+    else:
+        window = days_in_window(days, day_offset)
+    day_rank = {day: i for i, day in enumerate(window)}
+    conn = open_db(db_path)
+    try:
+        where = [f"day IN ({','.join('?' * len(window))})"]
+        params: list[Any] = list(window)
+        if options.since_ms is not None:
+            where.append("ts >= ?")
+            params.append(options.since_ms)
+        if options.until_ms is not None:
+            where.append("ts < ?")
+            params.append(options.until_ms)
+        if session:
+            where.append("sessionKey = ?")
+            params.append(session)
+        if model:
+            # Resolve the substring to the matching distinct finalModel values
+            # first, so the row lookup is an index seek.
+            needle = model.lower()
+            names = [
+                name for (name,) in conn.execute("SELECT DISTINCT finalModel FROM decisions WHERE finalModel IS NOT NULL")
+                if needle in name.lower()
+            ]
+            where.append(f"finalModel IN ({','.join('?' * len(names))})")
+            params.extend(names)
+        all_rows = " AND ".join(where)
+        chat = all_rows + " AND event = 'chat_completion'"
+
+        def grouped(expr: str, extra: str = "", cond: str = chat) -> dict[Any, list[Any]]:
+            sql = f"SELECT {expr}, day, MIN(id){extra} FROM decisions WHERE {cond} GROUP BY {expr}, day"
+            return _first_seen(conn.execute(sql, params), day_rank)
+
+        agg = RouterSummary(options)
+        agg.total = conn.execute(f"SELECT COUNT(*) FROM decisions WHERE {all_rows}", params).fetchone()[0]
+        (agg.chat_total, agg.escalation_total, agg.tool_gate_total, agg.tool_gate_success_total,
+         agg.retry_sum, agg.retry_n, agg.latency_sum, agg.latency_n) = conn.execute(
+            "SELECT COUNT(*), TOTAL(toolGateEscalated), TOTAL(toolGateActive), TOTAL(toolGateHadValidToolCalls), "
+            "TOTAL(toolGateRetryCount), COUNT(toolGateRetryCount), TOTAL(responseTimeMs), COUNT(responseTimeMs) "
+            f"FROM decisions WHERE {chat}",
+            params,
+        ).fetchone()
+        for name in ("escalation_total", "tool_gate_total", "tool_gate_success_total"):
+            setattr(agg, name, int(getattr(agg, name)))
+
+        agg.model_counts = Counter({k: v[0] for k, v in grouped("model", ", COUNT(*)").items()})
+        agg.source_counts = Counter(
+            {k: v[0] for k, v in grouped("COALESCE(modelSource, 'unknown')", ", COUNT(*)").items()}
+        )
+        agg.task_counts = Counter({k: v[0] for k, v in grouped("COALESCE(taskType, 'unknown')", ", COUNT(*)").items()})
+        agg.session_counts = Counter(
+            {k: v[0] for k, v in grouped("COALESCE(sessionKey, 'unknown')", ", COUNT(*)").items()}
+        )
+        pairs = conn.execute(
+            f"SELECT COALESCE(taskType, 'unknown'), model, day, MIN(id), COUNT(*) FROM decisions WHERE {chat} "
+            "GROUP BY 1, 2, day",
+            params,
+        )
+        for (task, mdl), (n,) in _first_seen((((t, m), d, i, n) for t, m, d, i, n in pairs), day_rank).items():
+            agg.model_by_task[task][mdl] = n
+
+        timed = chat + " AND responseTimeMs IS NOT NULL"
+        for mdl, (total, n) in grouped("model", ", TOTAL(responseTimeMs), COUNT(*)", timed).items():
+            agg.latency_by_model[mdl] = [total, n]
+            agg.latency_sketch_by_model[mdl] = LatencySketch()
+        buckets = conn.execute(
+            "SELECT model, COALESCE(taskType, 'unknown'), latencyBucket, COUNT(*), MIN(responseTimeMs), "
+            f"MAX(responseTimeMs) FROM decisions WHERE {timed} GROUP BY 1, 2, 3",
+            params,
+        )
+        for mdl, task, k, n, lo, hi in buckets:
+            sketch = agg.latency_sketch_by_task.get(task)
+            if sketch is None:
+                sketch = agg.latency_sketch_by_task[task] = LatencySketch()
+            for target in (agg.latency_sketch, agg.latency_sketch_by_model[mdl], sketch):
+                target.count += n
+                target.min = min(target.min, float(lo))
+                target.max = max(target.max, float(hi))
+                if k is None:
+                    target.zero_count += n
+                else:
+                    target.buckets[k] = target.buckets.get(k, 0) + n
+
+        if agg.timeline is not None:
+            cols = ", ".join(TIMELINE_FIELDS)
+            for row in conn.execute(f"SELECT {cols} FROM decisions WHERE {chat} ORDER BY day DESC, id", params):
+                item = dict(zip(TIMELINE_FIELDS, row))
+                for flag in ("toolGateActive", "toolGateEscalated"):
+                    item[flag] = bool(item[flag])
+                agg.timeline.append(item)
+        return agg
+    finally:
+        conn.close()
+
+
+def run_ingest(args: argparse.Namespace) -> int:
+    db_path = getattr(args, "db", None) or default_db_path(args.log_dir)
+    started = time.monotonic()
+    done = ingest_logs(args.log_dir, db_path, args.decoder)
+    for name, rows in done:
+        if rows:
+            print(f"- {name}: +{rows} rows")
+    print(f"ingested {sum(rows for _, rows in done)} row(s) from {len(done)} file(s) into {db_path} "
+          f"in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+# ── Live follow mode ─────────────────────────────────────────
+
+FOLLOW_WINDOWS = (("5m", 300, 5), ("1h", 3600, 60))
+WINDOW_FIELDS = (
+    "events", "chat", "errors", "escalations", "gate_active",
+    "retry_sum", "retry_n", "latency_sum", "latency_n",
+)
+
+
+class RollingWindow:
+    """
+    Aggregate over the last `span` seconds, kept in `step`-second slots.
+
+    add() touches one slot and the running totals. Slots that fall out of
+    the window are subtracted from the totals once, so upkeep is amortized
+    O(1) per event and a snapshot never rescans the window.
+    """
+
+    def __init__(self, name: str, span: int, step: int) -> None:
+        self.name = name
+        self.span = span
+        self.step = step
+        self.slots: deque[tuple[int, dict[str, float], Counter, Counter]] = deque()
+        self.totals: dict[str, float] = dict.fromkeys(WINDOW_FIELDS, 0)
+        self.models: Counter = Counter()
+        self.hist: Counter = Counter()
+
+    def add(self, rec: dict[str, Any], ts_s: float) -> None:
+        idx = int(ts_s // self.step)
+        if not self.slots or self.slots[-1][0] < idx:
+            self.slots.append((idx, dict.fromkeys(WINDOW_FIELDS, 0), Counter(), Counter()))
+        # A record that arrives slightly out of order is folded into the newest slot.
+        _, counts, models, hist = self.slots[-1]
+
+        delta: dict[str, float] = {"events": 1}
+        if rec.get("event") == "chat_completion":
+            delta["chat"] = 1
+            mdl = str(rec.get("finalModel") or rec.get("selectedModel") or "unknown")
+            models[mdl] += 1
+            self.models[mdl] += 1
+            status = safe_num(rec.get("responseStatusCode"))
+            if status is not None and status >= 400:
+                delta["errors"] = 1
+            if rec.get("toolGateEscalated"):
+                delta["escalations"] = 1
+            if rec.get("toolGateActive"):
+                delta["gate_active"] = 1
+            retries = safe_num(rec.get("toolGateRetryCount"))
+            if retries is not None:
+                delta["retry_sum"] = retries
+                delta["retry_n"] = 1
+            rt = safe_num(rec.get("responseTimeMs"))
+            if rt is not None and math.isfinite(rt):
+                delta["latency_sum"] = rt
+                delta["latency_n"] = 1
+                k = LatencySketch.bucket_of(rt)
+                hist[k] += 1
+                self.hist[k] += 1
+        for key, v in delta.items():
+            counts[key] += v
+            self.totals[key] += v
+
+    def expire(self, now_s: float) -> None:
+        oldest = int((now_s - self.span) // self.step)
+        while self.slots and self.slots[0][0] <= oldest:
+            _, counts, models, hist = self.slots.popleft()
+            for key, v in counts.items():
+                self.totals[key] -= v
+            for running, expired in ((self.models, models), (self.hist, hist)):
+                for key, n in expired.items():
+                    running[key] -= n
+                    if running[key] <= 0:
+                        del running[key]
+
+    def snapshot(self, elapsed_s: float) -> dict[str, Any]:
+        t = self.totals
+        chat = int(t["chat"])
+        sketch = LatencySketch()
+        sketch.zero_count = self.hist.get(None, 0)
+        sketch.buckets = {k: n for k, n in self.hist.items() if k is not None}
+        sketch.count = int(t["latency_n"])
+        sketch.min, sketch.max = 0.0, math.inf
+        seconds = max(1.0, min(float(self.span), elapsed_s))
+        return {
+            "window": self.name,
+            "events": int(t["events"]),
+            "requests": chat,
+            "requests_per_s": round(chat / seconds, 3),
+            "errors": int(t["errors"]),
+            "escalation_rate_pct": round(t["escalations"] / chat * 100, 2) if chat else 0.0,
+            "avg_retry_count": round(t["retry_sum"] / t["retry_n"], 2) if t["retry_n"] else 0.0,
+            "latency_ms": {
+                "avg": round(t["latency_sum"] / t["latency_n"], 2) if t["latency_n"] else 0.0,
+                **{name: round(sketch.quantile(q), 2) for name, q in LatencySketch.QUANTILES},
+            },
+            "top_models": dict(self.models.most_common(5)),
+        }
+
+
+def follow_lines(log_dir: Path, poll_s: float, from_start: bool = False) -> Iterator[bytes | None]:
+    """
+    Yield complete lines appended to today's day file, and None after each
+    idle poll. The file that exists at start-up is tailed from its end (or
+    read whole with from_start); at UTC midnight the old file is drained and
+    the new day's file is read from its start. A truncated or replaced file
+    is reopened from the start.
+    """
+    day = days_in_window(1)[0]
+    path = log_dir / f"router-decisions-{day}.jsonl"
+    f: BinaryIO | None = None
+    start_at_end = not from_start
+    buf = b""
+    try:
+        while True:
+            if f is None and path.exists():
+                f = path.open("rb")
+                if start_at_end:
+                    f.seek(0, os.SEEK_END)
+            start_at_end = False
+            data = f.read(1024 * 1024) if f is not None else b""
+            if data:
+                *lines, buf = (buf + data).split(b"\n")
+                yield from lines
+                continue
+
+            today = days_in_window(1)[0]
+            if today != day:
+                if f is not None:
+                    f.close()
+                day, path, f, buf = today, log_dir / f"router-decisions-{today}.jsonl", None, b""
+                continue
+            if f is not None:
+                try:
+                    st = path.stat()
+                except FileNotFoundError:
+                    st = None
+                if st is None or st.st_ino != os.fstat(f.fileno()).st_ino or st.st_size < f.tell():
+                    f.close()
+                    f, buf = None, b""
+                    continue
+            yield None
+            time.sleep(poll_s)
+    finally:
+        if f is not None:
+            f.close()
+
+
+def render_follow(snapshots: list[dict[str, Any]], now_s: float, session: str, model: str) -> str:
+    stamp = datetime.fromtimestamp(now_s, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    lines = [
+        f"Router decisions (live) {stamp}  session={session or 'any'} model={model or 'any'}",
+        f"{'window':<7}{'req':>8}{'req/s':>9}{'err':>6}{'esc%':>7}{'retry':>7}{'avg':>9}{'p50':>9}{'p95':>9}{'p99':>9}",
+    ]
+    for snap in snapshots:
+        lat = snap["latency_ms"]
+        lines.append(
+            f"{snap['window']:<7}{snap['requests']:>8}{snap['requests_per_s']:>9}{snap['errors']:>6}"
+            f"{snap['escalation_rate_pct']:>7}{snap['avg_retry_count']:>7}"
+            f"{lat['avg']:>9}{lat['p50']:>9}{lat['p95']:>9}{lat['p99']:>9}"
+        )
+    for snap in snapshots:
+        top = ", ".join(f"{m}={c}" for m, c in snap["top_models"].items())
+        lines.append(f"top models {snap['window']}: {top or 'none'}")
+    return "\n".join(lines)
+
+
+def run_follow(args: argparse.Namespace) -> int:
+    windows = [RollingWindow(name, span, step) for name, span, step in FOLLOW_WINDOWS]
+    decode = get_decoder(args.decoder)
+    prefilter = make_line_prefilter(args.session, args.model)
+    clear = sys.stdout.isatty() and not args.json
+    started = time.time()
+    next_refresh = time.monotonic()
+    try:
+        for line in follow_lines(args.log_dir, min(1.0, args.interval)):
+            if line:
+                for rec in apply_filters(iter_records((line,), decode, prefilter), args.session, args.model):
+                    ts = safe_num(rec.get("ts"))
+                    ts_s = ts / 1000 if ts is not None else time.time()
+                    for w in windows:
+                        w.add(rec, ts_s)
+            if time.monotonic() < next_refresh:
+                continue
+            now = time.time()
+            for w in windows:
+                w.expire(now)
+            snapshots = [w.snapshot(now - started) for w in windows]
+            if args.json:
+                print(json.dumps({"ts": int(now * 1000), "windows": snapshots}), flush=True)
+            else:
+                print(("\x1b[H\x1b[2J" if clear else "") + render_follow(snapshots, now, args.session, args.model) + "\n", flush=True)
+            next_refresh = time.monotonic() + args.interval
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# ── Metrics exporter ─────────────────────────────────────────
+#
+# `export` tails today's log with follow_lines() on a background thread and
+# serves the running totals at /metrics. Counters only grow for the life of
+# the process (Prometheus handles the reset on restart); label sets are
+# bounded by models x task types x sources, never sessions. Latency is
+# exported in seconds, the Prometheus base unit; buckets and the running sum
+# stay in the records' milliseconds until rendered.
+
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+METRIC_PREFIX = "openclaw_router"
+METRIC_HELP = {
+    "events": ("counter", "Router decision records by event."),
+    "chat_completions": ("counter", "Chat completions by final model, task type and selection source."),
+    "chat_errors": ("counter", "Chat completions answered with HTTP status >= 400."),
+    "tool_gate_active": ("counter", "Chat completions with the tool gate active."),
+    "tool_gate_valid_tool_calls": ("counter", "Gated chat completions that produced valid tool calls."),
+    "tool_gate_retries": ("counter", "Tool-gate retries."),
+    "tool_gate_escalations": ("counter", "Chat completions escalated by the tool gate."),
+    "response_time_seconds": ("histogram", "Chat completion response time in seconds."),
+    "last_event_timestamp_seconds": ("gauge", "ts of the newest record read."),
+}
+
+
+def _label_value(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_label_value(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class RouterMetrics:
+    """Thread-safe running totals rendered in Prometheus or OpenMetrics text format."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # metric -> (label names, {label values: value})
+        self.counters: dict[str, tuple[tuple[str, ...], dict[tuple[str, ...], float]]] = {
+            "events": (("event",), {}),
+            "chat_completions": (("model", "task", "source"), {}),
+            "chat_errors": (("model",), {}),
+            "tool_gate_active": (("model",), {}),
+            "tool_gate_valid_tool_calls": (("model",), {}),
+            "tool_gate_retries": (("model",), {}),
+            "tool_gate_escalations": (("model",), {}),
+        }
+        # model -> [per-bucket counts..., +Inf count, sum, count]
+        self.latency: dict[str, list[float]] = {}
+        self.last_ts = 0.0
+
+    def _inc(self, metric: str, key: tuple[str, ...], n: float = 1) -> None:
+        values = self.counters[metric][1]
+        values[key] = values.get(key, 0) + n
+
+    def add(self, e: dict[str, Any]) -> None:
+        with self.lock:
+            ts = safe_num(e.get("ts"))
+            if ts is not None and math.isfinite(ts):
+                self.last_ts = max(self.last_ts, ts / 1000)
+            event = str(e.get("event", "unknown"))
+            self._inc("events", (event,))
+            if event != "chat_completion":
+                return
+            mdl = str(e.get("finalModel") or e.get("selectedModel") or "unknown")
+            self._inc("chat_completions", (mdl, str(e.get("taskType", "unknown")), str(e.get("modelSource", "unknown"))))
+            status = safe_num(e.get("responseStatusCode"))
+            if status is not None and status >= 400:
+                self._inc("chat_errors", (mdl,))
+            if e.get("toolGateActive"):
+                self._inc("tool_gate_active", (mdl,))
+            if e.get("toolGateHadValidToolCalls"):
+                self._inc("tool_gate_valid_tool_calls", (mdl,))
+            retries = safe_num(e.get("toolGateRetryCount"))
+            if retries and math.isfinite(retries):
+                self._inc("tool_gate_retries", (mdl,), retries)
+            if e.get("toolGateEscalated"):
+                self._inc("tool_gate_escalations", (mdl,))
+            rt = safe_num(e.get("responseTimeMs"))
+            if rt is None or not math.isfinite(rt):
+                return
+            hist = self.latency.get(mdl)
+            if hist is None:
+                hist = self.latency[mdl] = [0] * (len(LATENCY_BUCKETS_MS) + 3)
+            i = 0
+            while i < len(LATENCY_BUCKETS_MS) and rt > LATENCY_BUCKETS_MS[i]:
+                i += 1
+            hist[i] += 1
+            hist[-2] += rt
+            hist[-1] += 1
+
+    def render(self, openmetrics: bool = False) -> str:
+        out: list[str] = []
+        with self.lock:
+            for metric, (names, values) in self.counters.items():
+                name = f"{METRIC_PREFIX}_{metric}"
+                kind, help_text = METRIC_HELP[metric]
+                family = name if openmetrics else f"{name}_total"
+                out.append(f"# HELP {family} {help_text}")
+                out.append(f"# TYPE {family} {kind}")
+                for key, v in sorted(values.items()):
+                    out.append(f"{name}_total{_labels(names, key)} {_fmt(v)}")
+            name = f"{METRIC_PREFIX}_response_time_seconds"
+            kind, help_text = METRIC_HELP["response_time_seconds"]
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            for mdl, hist in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, n in zip((*(repr(ms / 1000) for ms in LATENCY_BUCKETS_MS), "+Inf"), hist[:-2]):
+                    cumulative += n
+                    le = 'le="%s"' % bound
+                    out.append(f"{name}_bucket{_labels(('model',), (mdl,), le)} {cumulative}")
+                out.append(f"{name}_sum{_labels(('model',), (mdl,))} {_fmt(hist[-2] / 1000)}")
+                out.append(f"{name}_count{_labels(('model',), (mdl,))} {_fmt(hist[-1])}")
+            name = f"{METRIC_PREFIX}_last_event_timestamp_seconds"
+            kind, help_text = METRIC_HELP["last_event_timestamp_seconds"]
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.append(f"{name} {_fmt(round(self.last_ts, 3))}")
+        if openmetrics:
+            out.append("# EOF")
+        return "\n".join(out) + "\n"
+
+
+def make_metrics_handler(metrics: RouterMetrics) -> type[BaseHTTPRequestHandler]:
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = metrics.render(openmetrics).encode("utf-8")
+            self.send_response(200)
+            self.send_header(
+                "Content-Type",
+                "application/openmetrics-text; version=1.0.0; charset=utf-8"
+                if openmetrics else "text/plain; version=0.0.4; charset=utf-8",
+            )
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return MetricsHandler
+
+
+def run_export(args: argparse.Namespace) -> int:
+    metrics = RouterMetrics()
+    decode = get_decoder(args.decoder)
+
+    def tail() -> None:
+        for line in follow_lines(args.log_dir, 1.0, from_start=not args.from_end):
+            if line:
+                for rec in iter_records((line,), decode):
+                    metrics.add(rec)
+
+    threading.Thread(target=tail, name="router-log-tail", daemon=True).start()
+    server = ThreadingHTTPServer((args.bind, args.port), make_metrics_handler(metrics))
+    print(f"serving router metrics on http://{args.bind}:{server.server_address[1]}/metrics", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+# ── Window comparison ────────────────────────────────────────
+
+# A latency percentile regresses when it grows by this much and both windows
+# have at least REGRESSION_MIN_TAIL samples above it (a p99 needs 5000
+# requests); sketch error is ~1%, tail noise is the real limit.
+REGRESSION_LATENCY_PCT = 15.0
+REGRESSION_MIN_TAIL = 50
+# Two-proportion z score for the escalation rate (2.58 ~ 99% two-sided).
+REGRESSION_Z = 2.58
+REGRESSION_RETRY_DELTA = 0.1
+COMPARE_PERCENTILES = ("p50", "p95", "p99")
+QUANTILE_OF = dict(LatencySketch.QUANTILES)
+
+
+def _pct_change(before: float, after: float) -> float | None:
+    return round((after - before) / before * 100, 1) if before else None
+
+
+def _two_proportion_z(hits_a: int, n_a: int, hits_b: int, n_b: int) -> float:
+    if not n_a or not n_b:
+        return 0.0
+    pooled = (hits_a + hits_b) / (n_a + n_b)
+    se = math.sqrt(pooled * (1 - pooled) * (1 / n_a + 1 / n_b))
+    return (hits_b / n_b - hits_a / n_a) / se if se else 0.0
+
+
+def compare_reports(baseline: dict[str, Any], current: dict[str, Any]) -> dict[str, Any]:
+    """Deltas from a baseline report to the current one, with flagged regressions."""
+    regressions: list[dict[str, Any]] = []
+
+    latency: dict[str, Any] = {}
+    base_pct = baseline["latency"]["percentiles_ms_by_model"]
+    for mdl, cur in current["latency"]["percentiles_ms_by_model"].items():
+        base = base_pct.get(mdl)
+        if base is None:
+            latency[mdl] = {"baseline": None, "current": cur, "change_pct": {}}
+            continue
+        change = {q: _pct_change(base[q], cur[q]) for q in COMPARE_PERCENTILES}
+        latency[mdl] = {"baseline": base, "current": cur, "change_pct": change}
+        for q in COMPARE_PERCENTILES:
+            tail = min(base["count"], cur["count"]) * (1 - QUANTILE_OF[q])
+            if tail >= REGRESSION_MIN_TAIL and change[q] is not None and change[q] >= REGRESSION_LATENCY_PCT:
+                regressions.append({
+                    "metric": f"latency_{q}_ms",
+                    "model": mdl,
+                    "baseline": base[q],
+                    "current": cur[q],
+                    "change_pct": change[q],
+                })
+
+    base_tg, cur_tg = baseline["tool_gate"], current["tool_gate"]
+    z = _two_proportion_z(
+        base_tg["escalation_count"], baseline["chat_events"], cur_tg["escalation_count"], current["chat_events"]
+    )
+    escalation = {
+        "baseline": base_tg["escalation_rate_pct"],
+        "current": cur_tg["escalation_rate_pct"],
+        "delta_pp": round(cur_tg["escalation_rate_pct"] - base_tg["escalation_rate_pct"], 2),
+        "z": round(z, 2),
+    }
+    if z >= REGRESSION_Z:
+        regressions.append({
+            "metric": "escalation_rate_pct",
+            "model": None,
+            "baseline": escalation["baseline"],
+            "current": escalation["current"],
+            "change_pct": _pct_change(escalation["baseline"], escalation["current"]),
+        })
+
+    retries = {
+        "baseline": base_tg["avg_retry_count"],
+        "current": cur_tg["avg_retry_count"],
+        "delta": round(cur_tg["avg_retry_count"] - base_tg["avg_retry_count"], 2),
+    }
+    if retries["delta"] >= REGRESSION_RETRY_DELTA:
+        regressions.append({
+            "metric": "avg_retry_count",
+            "model": None,
+            "baseline": retries["baseline"],
+            "current": retries["current"],
+            "change_pct": _pct_change(retries["baseline"], retries["current"]),
+        })
+
+    mix: dict[str, Any] = {}
+    base_n, cur_n = baseline["chat_events"], current["chat_events"]
+    for mdl in dict.fromkeys([*current["model_counts"], *baseline["model_counts"]]):
+        before = round(baseline["model_counts"].get(mdl, 0) / base_n * 100, 2) if base_n else 0.0
+        after = round(current["model_counts"].get(mdl, 0) / cur_n * 100, 2) if cur_n else 0.0
+        mix[mdl] = {"baseline": before, "current": after, "delta_pp": round(after - before, 2)}
 
     return {
-        "window_days": days,
-        "filters": {"session": session or None, "model": model or None},
-        "total_events": total,
-        "chat_events": chat_total,
-        "session_count": len(session_counts),
-        "model_counts": dict(model_counts.most_common()),
-        "model_source_counts": dict(source_counts.most_common()),
-        "task_type_counts": dict(task_counts.most_common()),
-        "top_sessions": dict(session_counts.most_common(10)),
-        "tool_gate": {
-            "active_count": tool_gate_total,
-            "success_count": tool_gate_success_total,
-            "escalation_count": escalation_total,
-            "escalation_rate_pct": round((escalation_total / chat_total) * 100, 2) if chat_total else 0.0,
-            "active_success_rate_pct": round((tool_gate_success_total / tool_gate_total) * 100, 2) if tool_gate_total else 0.0,
-            "avg_retry_count": round(avg_retries, 2),
-        },
-        "latency": {
-            "avg_ms": round(avg_latency_ms, 2),
-            "avg_ms_by_model": avg_latency_by_model,
-        },
-        "model_by_task": {
-            task: dict(counter.most_common()) for task, counter in sorted(model_by_task.items())
-        },
+        "baseline_window": {"window_days": baseline["window_days"], **{
+            k: baseline["filters"][k] for k in ("since", "until") if k in baseline["filters"]
+        }},
+        "baseline_chat_events": base_n,
+        "latency_by_model": latency,
+        "escalation_rate_pct": escalation,
+        "avg_retry_count": retries,
+        "model_mix_pct": mix,
+        "regressions": regressions,
     }
 
 
+def baseline_window(args: argparse.Namespace) -> tuple[int, int, int | None, int | None]:
+    """(days, day_offset, since_ms, until_ms) of the --compare-to window."""
+    if args.compare_to != "previous":
+        since_ms, until_ms = args.compare_range
+        return len(days_in_range(since_ms, until_ms)), 0, since_ms, until_ms
+    if args.since_ms is None:
+        return args.days, args.days, None, None
+    until_ms = args.until_ms if args.until_ms is not None else int(time.time() * 1000)
+    span = until_ms - args.since_ms
+    return len(days_in_range(args.since_ms - span, args.since_ms)), 0, args.since_ms - span, args.since_ms
+
+
+def render_comparison(cmp: dict[str, Any]) -> list[str]:
+    window = cmp["baseline_window"]
+    if window.get("since"):
+        label = f"{window['since']} .. {window['until']}"
+    else:
+        label = f"previous {window['window_days']} day(s)"
+    lines = [f"## Comparison vs {label}"]
+    lines.append(f"- Baseline chat events: {cmp['baseline_chat_events']}")
+    esc = cmp["escalation_rate_pct"]
+    lines.append(f"- Escalation rate: {esc['baseline']}% -> {esc['current']}% ({esc['delta_pp']:+} pp, z={esc['z']})")
+    retries = cmp["avg_retry_count"]
+    lines.append(f"- Avg retries: {retries['baseline']} -> {retries['current']} ({retries['delta']:+})")
+    lines.append("- Model mix:")
+    for mdl, share in cmp["model_mix_pct"].items():
+        lines.append(f"  - {mdl}: {share['baseline']}% -> {share['current']}% ({share['delta_pp']:+} pp)")
+    lines.append("- Latency by model:")
+    for mdl, row in cmp["latency_by_model"].items():
+        if row["baseline"] is None:
+            lines.append(f"  - {mdl}: new, {format_percentiles(row['current'])}")
+            continue
+        parts = []
+        for q in COMPARE_PERCENTILES:
+            change = row["change_pct"][q]
+            parts.append(f"{q} {row['baseline'][q]}->{row['current'][q]}ms" + (f" ({change:+}%)" if change is not None else ""))
+        lines.append(f"  - {mdl}: " + ", ".join(parts))
+    lines.append("")
+    lines.append("### Regressions")
+    for r in cmp["regressions"]:
+        scope = f" {r['model']}" if r["model"] else ""
+        change = f" ({r['change_pct']:+}%)" if r["change_pct"] is not None else ""
+        lines.append(f"- {r['metric']}{scope}: {r['baseline']} -> {r['current']}{change}")
+    if not cmp["regressions"]:
+        lines.append("- none")
+    lines.append("")
+    return lines
+
+
+SERIES_COLUMNS = (
+    "bucket_start", "group", "requests", "errors", "escalations",
+    "avg_ms", "p50", "p90", "p95", "p99", "max",
+)
+
+
+def write_series_csv(rows: list[dict[str, Any]], out: Any) -> None:
+    writer = csv.DictWriter(out, fieldnames=SERIES_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+
+
+def format_percentiles(pct: dict[str, Any]) -> str:
+    return (
+        f"n={pct['count']}, p50={pct['p50']} ms, p90={pct['p90']} ms, "
+        f"p95={pct['p95']} ms, p99={pct['p99']} ms, max={pct['max']} ms"
+    )
+
+
 def render_markdown(summary: dict[str, Any]) -> str:
     lines: list[str] = []
     lines.append("# Router Decision Analysis")
     lines.append("")
-    lines.append(f"- Window: last {summary['window_days']} day(s)")
+    since = summary["filters"].get("since")
+    if since:
+        lines.append(f"- Window: {since} .. {summary['filters']['until'] or 'now'}")
+    else:
+        lines.append(f"- Window: last {summary['window_days']} day(s)")
     lines.append(f"- Filters: session={summary['filters']['session'] or 'none'}, model={summary['filters']['model'] or 'none'}")
     lines.append(f"- Total events: {summary['total_events']}")
     lines.append(f"- Chat completion events: {summary['chat_events']}")
@@ -183,12 +3408,29 @@ def render_markdown(summary: dict[str, Any]) -> str:
 
     lines.append("## Latency")
     lines.append(f"- Avg response time: {summary['latency']['avg_ms']} ms")
+    lines.append(f"- Percentiles: {format_percentiles(summary['latency']['percentiles_ms'])}")
     if summary["latency"]["avg_ms_by_model"]:
         lines.append("- Avg by model:")
         for model, ms in summary["latency"]["avg_ms_by_model"].items():
             lines.append(f"  - {model}: {ms} ms")
     lines.append("")
 
+    lines.append("## Latency Percentiles by Model")
+    if summary["latency"]["percentiles_ms_by_model"]:
+        for model, pct in summary["latency"]["percentiles_ms_by_model"].items():
+            lines.append(f"- {model}: {format_percentiles(pct)}")
+    else:
+        lines.append("- none")
+    lines.append("")
+
+    lines.append("## Latency Percentiles by Task")
+    if summary["latency"]["percentiles_ms_by_task"]:
+        for task, pct in summary["latency"]["percentiles_ms_by_task"].items():
+            lines.append(f"- {task}: {format_percentiles(pct)}")
+    else:
+        lines.append("- none")
+    lines.append("")
+
     lines.append("## Top Sessions")
     if summary["top_sessions"]:
         for sk, count in summary["top_sessions"].items():
@@ -205,15 +3447,211 @@ def render_markdown(summary: dict[str, Any]) -> str:
     else:
         lines.append("- none")
     lines.append("")
+    series = summary.get("series")
+    if series is not None:
+        lines.append(f"## Time Series ({series['bucket_s']}s buckets{', by model' if series['by_model'] else ''})")
+        for row in series["rows"]:
+            group = "" if row["group"] == "all" else f" {row['group']}"
+            lines.append(
+                f"- {row['bucket_start']}{group}: requests={row['requests']} errors={row['errors']} "
+                f"escalations={row['escalations']} p50={row['p50']}ms p95={row['p95']}ms"
+            )
+        if not series["rows"]:
+            lines.append("- none")
+        lines.append("")
+    gate = summary.get("gate_overhead")
+    if gate is not None:
+        lines.append("## Tool-Gate Overhead")
+        lines.append(f"- Extra per retry: {gate['extra_ms_per_retry']} ms")
+        lines.append(f"- Extra per escalation: {gate['extra_ms_per_escalation']} ms")
+        lines.append(f"- Extra wall time: {gate['extra_wall_s_total']} s")
+        for day, secs in gate["extra_wall_s_by_day"].items():
+            lines.append(f"  - {day}: {secs} s")
+        lines.append("- By model (originalModel):")
+        for mdl, row in gate["by_model"].items():
+            gated = format_percentiles(row["latency_gated_ms"]) if row["latency_gated_ms"] else "n/a"
+            ungated = format_percentiles(row["latency_ungated_ms"]) if row["latency_ungated_ms"] else "n/a"
+            lines.append(
+                f"  - {mdl}: +{row['extra_ms_per_gated_request']} ms per gated request "
+                f"({row['retried']} retried, {row['escalated']} escalated of {row['gated']})"
+            )
+            lines.append(f"    - gated: {gated}")
+            lines.append(f"    - ungated: {ungated}")
+        lines.append("- By task type:")
+        for task, row in gate["by_task"].items():
+            lines.append(
+                f"  - {task}: +{row['extra_ms_per_gated_request']} ms per gated request, "
+                f"{row['valid_tool_calls_pct']}% valid tool calls, {row['extra_ms_total'] / 1000:.1f} s total"
+            )
+        lines.append("")
+    conc = summary.get("concurrency")
+    if conc is not None:
+        lines.append("## Concurrency")
+        lines.append(
+            f"- Requests: {conc['requests']}, busy {conc['busy_s']} s, peak {conc['peak']} in flight, "
+            f"avg {conc['avg_busy']} while busy"
+        )
+        lines.append(
+            f"- In flight (share of busy time): p50={conc['p50']}, p90={conc['p90']}, "
+            f"p95={conc['p95']}, p99={conc['p99']}"
+        )
+        mp = conc["minute_peak_percentiles"]
+        lines.append(f"- Per-minute peak: p50={mp['p50']}, p90={mp['p90']}, p95={mp['p95']}, p99={mp['p99']}")
+        lines.append(f"- Latency vs in-flight at arrival (Spearman): {conc['latency_vs_concurrency_spearman']}")
+        lines.append("- Latency by in-flight at arrival:")
+        for label, pct in conc["latency_by_arrival_concurrency"].items():
+            lines.append(f"  - {label}: {format_percentiles(pct)}")
+        lines.append("- By model:")
+        for mdl, row in conc["by_model"].items():
+            lines.append(
+                f"  - {mdl}: peak={row['peak']} p95={row['p95']} avg={row['avg_busy']} "
+                f"(n={row['requests']}, latency vs load rho={row['latency_vs_concurrency_spearman']})"
+            )
+        lines.append("- Busiest minutes:")
+        for row in sorted(conc["by_minute"], key=lambda r: (-r["peak"], -r["avg"]))[:10]:
+            lines.append(f"  - {row['minute']}: peak={row['peak']} avg={row['avg']} arrivals={row['arrivals']}")
+        if not conc["by_minute"]:
+            lines.append("  - none")
+        lines.append("")
+    slow = summary.get("slowest")
+    if slow is not None:
+        lines.append(f"## Slowest Requests (top {slow['limit']})")
+        for row in slow["rows"]:
+            ts = safe_num(row["ts"])
+            when = format_ms(ts) if ts is not None and math.isfinite(ts) else "?"
+            flags = []
+            if row["toolGateRetryCount"]:
+                flags.append(f"retries={row['toolGateRetryCount']}")
+            if row["toolGateEscalated"]:
+                flags.append("escalated")
+            if row["responseStatusCode"] is not None and safe_num(row["responseStatusCode"]) not in (None, 200.0):
+                flags.append(f"status={row['responseStatusCode']}")
+            if row["outlier"]:
+                flags.append(f"outlier z={row['robust_z']}")
+            preview = str(row["userMessagePreview"] or "").replace("\n", " ")
+            if len(preview) > 80:
+                preview = preview[:77] + "..."
+            lines.append(
+                f"- {row['responseTimeMs']} ms {when} {row['model']} {row['taskType'] or 'unknown'} "
+                f"session={row['sessionKey']} tools={row['toolsCount']} chars={row['userMessageChars']}"
+                + (f" [{', '.join(flags)}]" if flags else "")
+            )
+            if preview:
+                lines.append(f"  - {preview}")
+        if not slow["rows"]:
+            lines.append("- none")
+        lines.append("- Outliers by model (robust z of ln latency > 3.5):")
+        for mdl, row in slow["outliers_by_model"].items():
+            lines.append(
+                f"  - {mdl}: {row['outliers']} of {row['requests']} above {row['outlier_threshold_ms']} ms "
+                f"(median {row['median_ms']} ms)"
+            )
+        lines.append("")
+    if "timeline" in summary:
+        lines.append("## Session Timeline")
+        for row in summary["timeline"]:
+            ts = safe_num(row["ts"])
+            when = format_ms(ts) if ts is not None and math.isfinite(ts) else "?"
+            route = row["finalModel"] or row["selectedModel"] or "unknown"
+            if row["selectedModel"] and row["finalModel"] and row["selectedModel"] != row["finalModel"]:
+                route = f"{row['selectedModel']} -> {row['finalModel']}"
+            flags = []
+            if row["toolGateRetryCount"]:
+                flags.append(f"retries={row['toolGateRetryCount']}")
+            if row["toolGateEscalated"]:
+                flags.append("escalated")
+            if row["responseStatusCode"] is not None and safe_num(row["responseStatusCode"]) not in (None, 200.0):
+                flags.append(f"status={row['responseStatusCode']}")
+            lines.append(
+                f"- {when} {row['taskType'] or 'unknown'}: {route} ({row['modelSource'] or 'unknown'}) "
+                f"{row['responseTimeMs']} ms" + (f" [{', '.join(flags)}]" if flags else "")
+            )
+        if not summary["timeline"]:
+            lines.append("- none")
+        lines.append("")
+    if "comparison" in summary:
+        lines.extend(render_comparison(summary["comparison"]))
     return "\n".join(lines)
 
 
+def run_compact(args: argparse.Namespace) -> int:
+    cache_dir = None if args.no_cache else (args.cache_dir or default_cache_dir(args.log_dir))
+    index_dir = None if args.no_index else (args.index_dir or default_index_dir(args.log_dir))
+    done = compact_logs(args.log_dir, args.format, args.level, args.keep_days, cache_dir, index_dir)
+    before = sum(b for _, b, _ in done)
+    after = sum(a for _, _, a in done)
+    for dst, b, a in done:
+        print(f"- {dst.name}: {b} -> {a} bytes")
+    ratio = f" ({before / after:.1f}x)" if after else ""
+    print(f"compacted {len(done)} file(s): {before} -> {after} bytes{ratio}")
+    if args.columnar:
+        built = build_columnar_archives(args.log_dir, args.keep_days, args.decoder)
+        for out_dir, rows in built:
+            print(f"- {out_dir.name}: {rows} rows")
+        print(f"built {len(built)} columnar archive(s)")
+    return 0
+
+
+def build_summary(args: argparse.Namespace, days: int, options: SummaryOptions, day_offset: int = 0) -> RouterSummary:
+    if args.db is not None:
+        return summarize_db(args.db, days, args.session, args.model, options, day_offset)
+    index_dir = None if args.no_index else (args.index_dir or default_index_dir(args.log_dir))
+    # Cached partials are plain unfiltered summaries; anything else streams the raw logs.
+    use_cache = not (args.no_cache or args.session or args.model or options.extended)
+    cache_dir = (args.cache_dir or default_cache_dir(args.log_dir)) if use_cache else None
+    return summarize_window(
+        args.log_dir, days, cache_dir, args.session, args.model, args.workers, args.decoder,
+        # Columnar archives drop previews and request-shape fields that --slowest
+        # and the --session timeline list, and the originalModel that
+        # --gate-overhead attributes cost to.
+        columnar=not (args.no_columnar or options.slowest or options.timeline or options.gate_overhead),
+        options=options, day_offset=day_offset, index_dir=index_dir,
+    )
+
+
 def main() -> int:
     args = parse_args()
-    entries = load_entries(args.log_dir, args.days)
-    filtered = apply_filters(entries, args.session, args.model)
-    summary = summarize(filtered, args.days, args.session, args.model)
-    if args.json:
+    if args.command == "compact":
+        return run_compact(args)
+    if args.command == "ingest":
+        return run_ingest(args)
+    if args.command == "export":
+        return run_export(args)
+    if args.follow:
+        return run_follow(args)
+    options = SummaryOptions(
+        bucket_ms=args.bucket_ms,
+        bucket_by_model=args.bucket_by_model,
+        since_ms=args.since_ms,
+        until_ms=args.until_ms,
+        timeline=bool(args.session),
+        gate_overhead=args.gate_overhead,
+        concurrency=args.concurrency,
+        slowest=max(0, args.slowest),
+    )
+    if args.query is not None:
+        result = query_window(
+            args.log_dir, args.days, args.query, args.session, args.model, args.workers, args.decoder, options,
+        ).to_report()
+        if args.csv:
+            writer = csv.DictWriter(sys.stdout, fieldnames=[*result["group_by"], *result["metrics"]], lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(result["rows"])
+        elif args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print(render_query_markdown(result))
+        return 0
+    agg = build_summary(args, args.days, options)
+    window_days = len(days_in_range(args.since_ms, args.until_ms)) if args.since_ms is not None else args.days
+    summary = agg.to_report(window_days, args.session, args.model)
+    if args.compare_to:
+        days, day_offset, since_ms, until_ms = baseline_window(args)
+        base = build_summary(args, days, SummaryOptions(since_ms=since_ms, until_ms=until_ms), day_offset)
+        summary["comparison"] = compare_reports(base.to_report(days, args.session, args.model), summary)
+    if args.csv:
+        write_series_csv(summary["series"]["rows"], sys.stdout)
+    elif args.json:
         print(json.dumps(summary, indent=2))
     else:
         print(render_markdown(summary))
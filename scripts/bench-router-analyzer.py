@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark analyze-router-decisions.py stages on synthetic logs.
+
+For each size (100k, 1M and 10M records by default) the suite writes a log set
+with gen-router-decisions.py, then times load_entries, apply_filters and
+summarize over it. Every stage runs in a fresh child process so its peak RSS is
+its own. Generated sets are kept under --data-dir and reused when the
+parameters match.
+
+  python3 scripts/bench-router-analyzer.py
+  python3 scripts/bench-router-analyzer.py --sizes 100k,1m --json
+  python3 scripts/bench-router-analyzer.py --data-dir /var/tmp/router-bench --decoder json
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+SCRIPTS = Path(__file__).resolve().parent
+STAGES = ("load_entries", "apply_filters", "summarize")
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def load_script(name: str, filename: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / filename)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def parse_size(text: str) -> int:
+    raw = text.strip().lower()
+    if raw and raw[-1] in SIZE_SUFFIXES:
+        return int(float(raw[:-1]) * SIZE_SUFFIXES[raw[-1]])
+    return int(raw)
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark router decision analyzer stages.")
+    p.add_argument("--sizes", type=str, default="100k,1m,10m", help="Comma-separated record counts (default: 100k,1m,10m).")
+    p.add_argument("--days", type=int, default=7, help="Day files per log set (default: 7).")
+    p.add_argument("--data-dir", type=Path, default=None, help="Keep generated log sets here (default: a temp dir).")
+    p.add_argument("--decoder", type=str, default="auto", help="Analyzer decoder to benchmark (default: auto).")
+    p.add_argument("--model", type=str, default="qwen", help="Model filter used by the apply_filters stage (default: qwen).")
+    p.add_argument("--json", action="store_true", help="Emit JSON instead of Markdown.")
+    p.add_argument("--child", nargs=2, metavar=("STAGE", "LOG_DIR"), help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def run_stage(stage: str, log_dir: Path, days: int, decoder: str, model: str) -> dict[str, Any]:
+    """Child side: run one stage and report its own time and peak RSS."""
+    analyzer = load_script("analyze_router_decisions", "analyze-router-decisions.py")
+    started = time.perf_counter()
+    entries = analyzer.load_entries(log_dir, days, decoder)
+    if stage == "load_entries":
+        records = sum(1 for _ in entries)
+    elif stage == "apply_filters":
+        records = sum(1 for _ in analyzer.apply_filters(entries, "", model))
+    else:
+        records = analyzer.summarize(entries, days, "", "")["total_events"]
+    secs = time.perf_counter() - started
+    return {
+        "records": records,
+        "secs": round(secs, 3),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def ensure_log_set(root: Path, records: int, days: int) -> tuple[Path, int]:
+    """Generate (or reuse) a log set ending today; returns its dir and record count."""
+    gen = load_script("gen_router_decisions", "gen-router-decisions.py")
+    out = root / f"records-{records}-days-{days}"
+    marker = out / ".complete"
+    today = time.strftime("%Y-%m-%d", time.gmtime())
+    # The analyzer windows end today, so a set written on another day is stale.
+    if marker.exists() and marker.read_text(encoding="utf-8").split()[0] == today:
+        return out, int(marker.read_text(encoding="utf-8").split()[1])
+    for old in out.glob("router-decisions-*"):
+        old.unlink()
+    per_day = -(-records // days)
+    gen.generate(out, days, per_day, gen.GenConfig())
+    marker.write_text(f"{today} {per_day * days}\n", encoding="utf-8")
+    return out, per_day * days
+
+
+def bench(args: argparse.Namespace, root: Path) -> list[dict[str, Any]]:
+    results = []
+    for size in (parse_size(s) for s in args.sizes.split(",") if s.strip()):
+        started = time.perf_counter()
+        log_dir, total = ensure_log_set(root, size, args.days)
+        gen_secs = time.perf_counter() - started
+        size_mb = sum(p.stat().st_size for p in log_dir.glob("*.jsonl")) / (1024 * 1024)
+        for stage in STAGES:
+            cmd = [
+                sys.executable, str(Path(__file__).resolve()), "--child", stage, str(log_dir),
+                "--days", str(args.days), "--decoder", args.decoder, "--model", args.model,
+            ]
+            out = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+            # The filter stage reads every record even though it yields fewer.
+            read = total if stage == "apply_filters" else out["records"]
+            results.append({
+                "size": total,
+                "size_mb": round(size_mb, 1),
+                "generate_secs": round(gen_secs, 1),
+                "stage": stage,
+                **out,
+                "records_per_sec": round(read / out["secs"]) if out["secs"] else 0,
+            })
+    return results
+
+
+def render(results: list[dict[str, Any]], decoder: str) -> str:
+    lines = [f"# Router analyzer benchmark (decoder={decoder})", ""]
+    lines.append("| records | MB | stage | secs | records/s | peak RSS MB |")
+    lines.append("|---|---|---|---|---|---|")
+    for r in results:
+        lines.append(
+            f"| {r['size']:,} | {r['size_mb']} | {r['stage']} | {r['secs']} | "
+            f"{r['records_per_sec']:,} | {r['peak_rss_mb']} |"
+        )
+    lines.append("")
+    return "\n".join(lines)
+
+
+def main() -> int:
+    args = parse_args()
+    if args.child:
+        stage, log_dir = args.child
+        print(json.dumps(run_stage(stage, Path(log_dir), args.days, args.decoder, args.model)))
+        return 0
+    if args.data_dir is not None:
+        args.data_dir.mkdir(parents=True, exist_ok=True)
+        results = bench(args, args.data_dir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = bench(args, Path(tmp))
+    print(json.dumps(results, indent=2) if args.json else render(results, args.decoder))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
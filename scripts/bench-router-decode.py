@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark the record decoders used by analyze-router-decisions.py.
+
+Writes a synthetic router-decisions JSONL file (1M lines by default, via
+gen-router-decisions.py), then times each decoder
+that is installed (msgspec, orjson, stdlib json) over the same file.
+
+  python3 scripts/bench-router-decode.py
+  python3 scripts/bench-router-decode.py --lines 200000
+  python3 scripts/bench-router-decode.py --file ~/.openclaw/logs/router-decisions/router-decisions-2026-10-01.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import ModuleType
+
+ANALYZER_PATH = Path(__file__).resolve().parent / "analyze-router-decisions.py"
+GENERATOR_PATH = Path(__file__).resolve().parent / "gen-router-decisions.py"
+
+
+def load_analyzer() -> ModuleType:
+    spec = importlib.util.spec_from_file_location("analyze_router_decisions", ANALYZER_PATH)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark router-decision record decoders.")
+    p.add_argument("--lines", type=int, default=1_000_000, help="Synthetic lines to generate (default: 1000000).")
+    p.add_argument("--file", type=Path, default=None, help="Benchmark an existing JSONL file instead.")
+    p.add_argument("--repeat", type=int, default=1, help="Runs per decoder; the best run is reported.")
+    return p.parse_args()
+
+
+def write_synthetic(path: Path, lines: int) -> None:
+    spec = importlib.util.spec_from_file_location("gen_router_decisions", GENERATOR_PATH)
+    gen = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = gen
+    spec.loader.exec_module(gen)
+    factory = gen.RecordFactory(gen.GenConfig(preview_chars=400), random.Random(7))
+    gen.write_day(path, datetime.now(timezone.utc).date(), lines, factory)
+
+
+def bench_decoder(analyzer: ModuleType, name: str, path: Path, repeat: int) -> tuple[int, float]:
+    decode = analyzer.get_decoder(name)
+    best = float("inf")
+    count = 0
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        with path.open("rb") as f:
+            count = sum(1 for _ in analyzer.iter_records(f, decode))
+        best = min(best, time.perf_counter() - started)
+    return count, best
+
+
+def main() -> int:
+    args = parse_args()
+    analyzer = load_analyzer()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            path = Path(tmp) / "router-decisions-bench.jsonl"
+            write_synthetic(path, args.lines)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        print(f"# Decoder benchmark: {path.name} ({size_mb:.1f} MB)")
+        print("")
+        rates: dict[str, float] = {}
+        for name, decode in analyzer.DECODERS.items():
+            if decode is None:
+                print(f"- {name}: not installed")
+                continue
+            count, secs = bench_decoder(analyzer, name, path, args.repeat)
+            rates[name] = count / secs if secs else 0.0
+            print(f"- {name}: {count} records in {secs:.2f}s ({rates[name]:,.0f} records/s)")
+        baseline = rates.get("json")
+        if baseline:
+            print("")
+            for name, rate in rates.items():
+                if name != "json":
+                    print(f"- {name} vs json: {rate / baseline:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Check that every installed decoder gives the same analyzer output as stdlib json.
+
+Runs analyze-router-decisions.py once per output mode and decoder over a
+synthetic log set (gen-router-decisions.py) or an existing --log-dir, and
+diffs each report against the --decoder json run. The modes are repeated
+on a copy compacted with `compact --columnar`, which must give the same
+reports as the plain day files. `ingest` is checked on the stored rows as
+well as the --db report. A decoder that drops a field shows up as a
+differing mode. Exits 1 on any difference.
+
+  python3 scripts/check-router-decoders.py
+  python3 scripts/check-router-decoders.py --log-dir ~/.openclaw/logs/router-decisions --days 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+SCRIPTS = Path(__file__).resolve().parent
+ANALYZER = SCRIPTS / "analyze-router-decisions.py"
+
+# (mode, analyzer arguments). Cached runs get a per-decoder --cache-dir and
+# index runs a per-decoder --index-dir; {session} is the busiest session.
+MODES: list[tuple[str, list[str]]] = [
+    ("summary", ["--no-cache"]),
+    ("summary-cached", []),
+    ("bucket", ["--bucket", "1h"]),
+    ("bucket-by-model", ["--bucket", "6h", "--bucket-by-model"]),
+    ("slowest", ["--slowest", "20"]),
+    ("session-index", ["--session", "{session}"]),
+    ("session-scan", ["--session", "{session}", "--no-index"]),
+    ("group-by-status", ["--group-by", "responseStatusCode"]),
+    ("group-by-where", [
+        "--group-by", "finalModel,isStreaming", "--where", "isStreaming=true",
+        "--metrics", "count,avg(toolsCount),p95(responseTimeMs),max(userMessageChars)",
+    ]),
+]
+
+
+def load_script(name: str, filename: str) -> ModuleType:
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS / filename)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Diff analyzer output across record decoders.")
+    p.add_argument("--log-dir", type=Path, default=None, help="Check an existing log set instead of a synthetic one.")
+    p.add_argument("--days", type=int, default=2, help="Window / synthetic day files (default: 2).")
+    p.add_argument("--records-per-day", type=int, default=20_000, help="Synthetic records per day (default: 20000).")
+    return p.parse_args()
+
+
+def run_analyzer(log_dir: Path, work: Path, decoder: str, days: int, extra: list[str]) -> Any:
+    cmd = [
+        sys.executable, str(ANALYZER), "--log-dir", str(log_dir), "--days", str(days), "--json",
+        "--decoder", decoder,
+        "--cache-dir", str(work / decoder / "cache"), "--index-dir", str(work / decoder / "index"),
+        *extra,
+    ]
+    return json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+
+
+def ingested(log_dir: Path, work: Path, decoder: str, days: int) -> tuple[Any, list[tuple[Any, ...]]]:
+    """Ingest with one decoder; returns the --db report and every stored row."""
+    db = work / decoder / "router-decisions.sqlite3"
+    db.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [sys.executable, str(ANALYZER), "--decoder", decoder, "ingest", "--log-dir", str(log_dir), "--db", str(db)],
+        check=True, capture_output=True,
+    )
+    report = run_analyzer(log_dir, work, decoder, days, ["--db", str(db)])
+    with sqlite3.connect(db) as conn:
+        rows = conn.execute("SELECT * FROM decisions ORDER BY id").fetchall()
+    return report, rows
+
+
+def newest_day(log_dir: Path) -> Path:
+    return max(log_dir.glob("router-decisions-*.jsonl"))
+
+
+def follow_snapshots(analyzer: ModuleType, path: Path, decoder: str) -> list[dict[str, Any]]:
+    """What --follow would show right after the day file's last record."""
+    windows = [analyzer.RollingWindow(name, span, step) for name, span, step in analyzer.FOLLOW_WINDOWS]
+    last = 0.0
+    with path.open("rb") as f:
+        for rec in analyzer.iter_records(f, analyzer.get_decoder(decoder)):
+            last = analyzer.safe_num(rec.get("ts")) / 1000
+            for w in windows:
+                w.add(rec, last)
+    for w in windows:
+        w.expire(last)
+    return [w.snapshot(3600) for w in windows]
+
+
+def export_metrics(analyzer: ModuleType, path: Path, decoder: str) -> str:
+    """What the export endpoint would serve after reading the day file."""
+    metrics = analyzer.RouterMetrics()
+    with path.open("rb") as f:
+        for rec in analyzer.iter_records(f, analyzer.get_decoder(decoder)):
+            metrics.add(rec)
+    return metrics.render(openmetrics=True)
+
+
+LIVE_CHECKS = {
+    "follow": follow_snapshots,
+    "export": export_metrics,
+}
+
+
+def check(log_dir: Path, work: Path, days: int) -> list[str]:
+    analyzer = load_script("analyze_router_decisions", "analyze-router-decisions.py")
+    decoders = [name for name, decode in analyzer.DECODERS.items() if decode is not None and name != "json"]
+    failures = []
+    top = run_analyzer(log_dir, work, "json", days, ["--no-cache"])["top_sessions"]
+    session = next(iter(top), "")
+    reports = {}
+    for mode, extra in MODES:
+        extra = [arg.replace("{session}", session) for arg in extra]
+        expected = reports[mode] = run_analyzer(log_dir, work, "json", days, extra)
+        for decoder in ["auto", *decoders]:
+            got = run_analyzer(log_dir, work, decoder, days, extra)
+            status = "ok" if got == expected else "DIFFERS"
+            print(f"- {mode} [{decoder}]: {status}")
+            if got != expected:
+                failures.append(f"{mode} [{decoder}]")
+    # Closed days served from columnar archives must match the plain files.
+    cols_dir = work / "columnar" / "logs"
+    shutil.copytree(log_dir, cols_dir)
+    subprocess.run(
+        [sys.executable, str(ANALYZER), "compact", "--log-dir", str(cols_dir), "--columnar"],
+        check=True, capture_output=True,
+    )
+    for mode, extra in MODES:
+        extra = [arg.replace("{session}", session) for arg in extra]
+        for decoder in ["json", "auto", *decoders]:
+            got = run_analyzer(cols_dir, work / "columnar", decoder, days, extra)
+            status = "ok" if got == reports[mode] else "DIFFERS"
+            print(f"- {mode} .cols [{decoder}]: {status}")
+            if got != reports[mode]:
+                failures.append(f"{mode} .cols [{decoder}]")
+    # The bucketed series must account for every error the raw records hold.
+    errors_total = sum(
+        1 for rec in analyzer.load_entries(log_dir, days, "json")
+        if rec.get("event") == "chat_completion" and (analyzer.safe_num(rec.get("responseStatusCode")) or 0) >= 400
+    )
+    for decoder in ["auto", *decoders]:
+        series = run_analyzer(log_dir, work, decoder, days, ["--bucket", "1h"])["series"]["rows"]
+        bucketed = sum(row["errors"] for row in series)
+        status = "ok" if bucketed == errors_total else f"DIFFERS ({bucketed} != {errors_total})"
+        print(f"- bucket errors total [{decoder}]: {status}")
+        if bucketed != errors_total:
+            failures.append(f"bucket errors total [{decoder}]")
+    # Live modes tail a file; replay the newest day through their aggregates.
+    path = newest_day(log_dir)
+    for mode, live in LIVE_CHECKS.items():
+        expected = live(analyzer, path, "json")
+        for decoder in ["auto", *decoders]:
+            got = live(analyzer, path, decoder)
+            status = "ok" if got == expected else "DIFFERS"
+            print(f"- {mode} [{decoder}]: {status}")
+            if got != expected:
+                failures.append(f"{mode} [{decoder}]")
+    expected = ingested(log_dir, work, "json", days)
+    for decoder in ["auto", *decoders]:
+        got = ingested(log_dir, work, decoder, days)
+        status = "ok" if got == expected else "DIFFERS"
+        print(f"- ingest + --db [{decoder}]: {status}")
+        if got != expected:
+            failures.append(f"ingest [{decoder}]")
+    return failures
+
+
+def main() -> int:
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        log_dir = args.log_dir
+        if log_dir is None:
+            gen = load_script("gen_router_decisions", "gen-router-decisions.py")
+            log_dir = work / "logs"
+            gen.generate(log_dir, args.days, args.records_per_day, gen.GenConfig())
+        failures = check(log_dir, work, args.days)
+    if failures:
+        print(f"\n{len(failures)} mismatch(es): {', '.join(failures)}")
+        return 1
+    print("\nall decoders agree")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Write synthetic router-decisions-YYYY-MM-DD.jsonl files.
+
+Records have the shape openclaw-session-proxy.js appends (appendRouterDecisionLog)
+and are in ts order within each day file, so every analyzer code path (seeking,
+caches, indexes, compaction) sees realistic input.
+
+  python3 scripts/gen-router-decisions.py --out /tmp/router-logs --days 7 --records-per-day 200000
+  python3 scripts/gen-router-decisions.py --out /tmp/router-logs --models 8 --sessions 5000 --latency-median-ms 900
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+MODEL_POOL = [
+    "ollama/qwen3:8b",
+    "openrouter/mistral-small",
+    "anthropic/claude-haiku",
+    "openai/gpt-4o-mini",
+    "ollama/llama3.1:8b",
+    "openrouter/deepseek-chat",
+    "anthropic/claude-sonnet",
+    "openai/gpt-4o",
+]
+# classifyTaskFromMessage() labels; "unknown" is reserved for empty messages.
+TASK_TYPES = ["debug", "refactor", "testing", "planning", "review", "implementation", "documentation", "general"]
+ESCALATE_MODEL = "openai/gpt-4o"
+PREVIEW_CHARS = "abcdefghijklmnopqrstuvwxyz     "
+# ROUTER_MSG_PREVIEW_MAX_CHARS in the proxy.
+PREVIEW_MAX_CHARS = 400
+
+
+@dataclass
+class GenConfig:
+    models: int = 4
+    sessions: int = 500
+    latency_median_ms: float = 1100.0
+    latency_sigma: float = 0.8
+    gate_rate: float = 0.3
+    retry_rate: float = 0.3
+    escalation_rate: float = 0.05
+    error_rate: float = 0.02
+    preview_chars: int = PREVIEW_MAX_CHARS
+    max_retries: int = 1
+    escalate_model: str = ESCALATE_MODEL
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Write synthetic router decision JSONL logs.")
+    p.add_argument("--out", type=Path, required=True, help="Directory to write day files into.")
+    p.add_argument("--days", type=int, default=7, help="Number of day files (default: 7).")
+    p.add_argument("--end-day", type=str, default="", help="Last day, YYYY-MM-DD (default: today, UTC).")
+    p.add_argument("--records-per-day", type=int, default=100_000, help="Records per day file (default: 100000).")
+    p.add_argument("--models", type=int, default=4, help="Distinct models, Zipf-weighted (default: 4).")
+    p.add_argument("--sessions", type=int, default=500, help="Distinct session keys, Zipf-weighted (default: 500).")
+    p.add_argument("--latency-median-ms", type=float, default=1100.0, help="Median responseTimeMs (default: 1100).")
+    p.add_argument("--latency-sigma", type=float, default=0.8, help="Log-normal sigma of responseTimeMs (default: 0.8).")
+    p.add_argument("--gate-rate", type=float, default=0.3, help="Share of requests with the tool gate active (default: 0.3).")
+    p.add_argument(
+        "--retry-rate", type=float, default=0.3, help="Share of gated requests whose first answer has no tool call (default: 0.3).",
+    )
+    p.add_argument(
+        "--escalation-rate", type=float, default=0.05, help="Share of gated requests still without one after every retry (default: 0.05).",
+    )
+    p.add_argument("--error-rate", type=float, default=0.02, help="Share of requests with HTTP >= 400 (default: 0.02).")
+    p.add_argument("--preview-chars", type=int, default=PREVIEW_MAX_CHARS, help="Max userMessagePreview length (default: 400).")
+    p.add_argument(
+        "--max-retries",
+        type=int,
+        default=1,
+        help="TOOL_GATE_MAX_RETRIES of the simulated proxy; with 0, gated requests escalate at --escalation-rate (default: 1).",
+    )
+    p.add_argument(
+        "--escalate-model",
+        type=str,
+        default=ESCALATE_MODEL,
+        help=f"TOOL_GATE_ESCALATE_MODEL of the simulated proxy; empty disables escalation (default: {ESCALATE_MODEL}).",
+    )
+    p.add_argument("--seed", type=int, default=7, help="Random seed (default: 7).")
+    return p.parse_args()
+
+
+def zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    return [1.0 / (k ** s) for k in range(1, n + 1)]
+
+
+class RecordFactory:
+    """Draws records from a GenConfig; one instance per generated log set."""
+
+    def __init__(self, cfg: GenConfig, rng: random.Random) -> None:
+        self.cfg = cfg
+        self.rng = rng
+        self.models = [MODEL_POOL[i] if i < len(MODEL_POOL) else f"synthetic/model-{i}" for i in range(max(1, cfg.models))]
+        self.model_weights = zipf_weights(len(self.models))
+        # Each model gets its own speed so per-model percentiles differ.
+        self.model_mu = {
+            m: math.log(cfg.latency_median_ms) + rng.uniform(-0.4, 0.4) for m in self.models
+        }
+        self.sessions = [f"agent:main:telegram:{1000 + i}" for i in range(max(1, cfg.sessions))]
+        self.session_weights = zipf_weights(len(self.sessions), 1.0)
+        # Previews are slices of one random text; drawing characters per record dominates otherwise.
+        self.text = "".join(rng.choices(PREVIEW_CHARS, k=max(0, cfg.preview_chars) * 64 + 1))
+
+    def _latency(self, model: str) -> float:
+        mu = self.model_mu.get(model, math.log(self.cfg.latency_median_ms))
+        return self.rng.lognormvariate(mu, self.cfg.latency_sigma)
+
+    def record(self, ts: int) -> dict[str, Any]:
+        """One record as openclaw-session-proxy.js logs a chat completion, tool gate included."""
+        rng, cfg = self.rng, self.cfg
+        model = rng.choices(self.models, self.model_weights)[0]
+        gated = rng.random() < cfg.gate_rate
+        # The gate runs for non-streaming requests with tools and tool_choice != "none".
+        if gated:
+            streaming = False
+            tools = rng.randint(1, 12)
+            tool_choice = rng.choice([None, None, "auto", "required"])
+        else:
+            streaming = rng.random() < 0.2
+            tools = rng.choice([0, 0, 0, 3])
+            tool_choice = "none" if tools and not streaming else None
+
+        latency = self._latency(model)
+        retries = 0
+        escalated = False
+        # Without retries the proxy escalates the first answer that has no tool
+        # call, so that answer fails at the escalation rate instead.
+        valid = rng.random() >= (cfg.retry_rate if cfg.max_retries > 0 else cfg.escalation_rate)
+        if gated and not valid:
+            if cfg.max_retries > 0:
+                # Per-retry failure odds that leave `escalation_rate` of gated requests invalid after every retry.
+                fail = (cfg.escalation_rate / cfg.retry_rate) ** (1 / cfg.max_retries)
+            while retries < cfg.max_retries and not valid:
+                retries += 1
+                latency += self._latency(model)
+                valid = rng.random() >= fail
+            if not valid and cfg.escalate_model and model != cfg.escalate_model:
+                escalated = True
+                latency += self._latency(cfg.escalate_model)
+                valid = rng.random() < 0.8
+        elif not gated:
+            valid = tools > 0 and rng.random() < 0.6
+
+        chars = rng.choice([0, *range(1, 40), *range(40, 4000, 37)])
+        n = min(chars, max(0, cfg.preview_chars))
+        at = rng.randrange(len(self.text) - n)
+        preview = self.text[at:at + n]
+        status = rng.choice([429, 500, 502]) if rng.random() < cfg.error_rate else 200
+        selected = cfg.escalate_model if escalated else model
+        return {
+            "ts": ts,
+            "event": "chat_completion",
+            "sessionKey": rng.choices(self.sessions, self.session_weights)[0],
+            "method": "POST",
+            "path": "/v1/chat/completions",
+            "isStreaming": streaming,
+            "taskType": rng.choice(TASK_TYPES) if chars else "unknown",
+            "userMessagePreview": preview,
+            "userMessageChars": chars,
+            "toolsCount": tools,
+            "toolChoice": tool_choice,
+            "originalModel": model,
+            "selectedModel": selected,
+            "finalModel": selected,
+            "modelSource": "tool-gate-escalation" if escalated else "passthrough",
+            "routerModelSelectionApplied": False,
+            "toolGateActive": gated,
+            "toolGateRetryCount": retries,
+            "toolGateEscalated": escalated,
+            "toolGateEscalateModel": cfg.escalate_model if escalated else "",
+            "toolGateHadValidToolCalls": valid if gated else None,
+            "responseStatusCode": status,
+            "responseHasToolCalls": valid,
+            "responseTimeMs": int(latency),
+        }
+
+
+def write_day(path: Path, day: date, records: int, factory: RecordFactory) -> int:
+    """Write one day file with `records` records spread over the day in ts order; returns bytes."""
+    start_ms = int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp() * 1000)
+    span = 86_400_000
+    rng = factory.rng
+    offsets = sorted(rng.randrange(span) for _ in range(records))
+    with path.open("w", encoding="utf-8") as f:
+        for off in offsets:
+            f.write(json.dumps(factory.record(start_ms + off), separators=(",", ":"), ensure_ascii=False) + "\n")
+        return f.tell()
+
+
+def generate(out: Path, days: int, records_per_day: int, cfg: GenConfig, seed: int = 7, end_day: date | None = None) -> list[Path]:
+    out.mkdir(parents=True, exist_ok=True)
+    end = end_day or datetime.now(timezone.utc).date()
+    factory = RecordFactory(cfg, random.Random(seed))
+    paths = []
+    for i in reversed(range(max(1, days))):
+        day = end - timedelta(days=i)
+        path = out / f"router-decisions-{day.isoformat()}.jsonl"
+        write_day(path, day, records_per_day, factory)
+        paths.append(path)
+    return paths
+
+
+def main() -> int:
+    args = parse_args()
+    cfg = GenConfig(
+        models=args.models,
+        sessions=args.sessions,
+        latency_median_ms=args.latency_median_ms,
+        latency_sigma=args.latency_sigma,
+        gate_rate=args.gate_rate,
+        retry_rate=args.retry_rate,
+        escalation_rate=args.escalation_rate,
+        error_rate=args.error_rate,
+        preview_chars=args.preview_chars,
+        max_retries=args.max_retries,
+        escalate_model=args.escalate_model,
+    )
+    end_day = date.fromisoformat(args.end_day) if args.end_day else None
+    for path in generate(args.out, args.days, args.records_per_day, cfg, args.seed, end_day):
+        print(f"- {path.name}: {path.stat().st_size} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,15 +10,22 @@ Runs every 15 minutes. Produces a single combined report at:
 State persisted in:
   /root/openclaw-stock-home/.openclaw/var/ops-state/cooldown-counters.json
   /root/openclaw-stock-home/.openclaw/var/ops-state/journal-cursor
+  /root/openclaw-stock-home/.openclaw/var/ops-state/telegram-router-state.json
 """
 import json
 import os
+import re
 import subprocess
 import time
 from collections import Counter
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+try:
+    from systemd import journal as sd_journal
+except ImportError:  # optional: read the journal without spawning journalctl
+    sd_journal = None
+
 MEMORY_DIR = Path("/root/openclaw-stock-home/.openclaw/workspace/memory")
 STATE_DIR = Path("/root/openclaw-stock-home/.openclaw/var/ops-state")
 LOG_DIR = Path("/root/openclaw-stock-home/.openclaw/logs")
@@ -28,7 +35,9 @@ GATEWAY_DROPIN = Path("/root/.config/systemd/user/openclaw-gateway.service.d/10-
 COMBINED_REPORT = MEMORY_DIR / "ops-combined-report.md"
 COOLDOWN_STATE = STATE_DIR / "cooldown-counters.json"
 CURSOR_FILE = STATE_DIR / "journal-cursor"
+TELEGRAM_STATE = STATE_DIR / "telegram-router-state.json"
 MAX_LOG_BYTES = 5 * 1024 * 1024  # 5 MB
+PROBE_TIMEOUT_S = 10
 MEMORY_BACKFILL_DAYS = 120
 
 for d in (MEMORY_DIR, STATE_DIR, LOG_DIR):
@@ -39,14 +48,24 @@ ts = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
 # ── helpers ──────────────────────────────────────────────────
 
-def unit_state(name: str) -> str:
+def unit_states(names: list) -> dict:
+    """ActiveState of every unit from a single `systemctl --user show` call."""
+    states = dict.fromkeys(names, "inactive")
     try:
-        return subprocess.check_output(
-            ["systemctl", "--user", "is-active", name],
-            text=True, stderr=subprocess.DEVNULL
-        ).strip()
-    except subprocess.CalledProcessError:
-        return "inactive"
+        out = subprocess.run(
+            ["systemctl", "--user", "show", "--property=ActiveState", "--", *names],
+            capture_output=True, text=True, timeout=PROBE_TIMEOUT_S,
+        ).stdout
+    except (OSError, subprocess.TimeoutExpired):
+        return states
+    # One block per unit, in argument order, separated by blank lines.
+    blocks = out.strip().split("\n\n")
+    if len(blocks) == len(names):
+        for name, block in zip(names, blocks):
+            for line in block.splitlines():
+                if line.startswith("ActiveState="):
+                    states[name] = line.split("=", 1)[1].strip() or "inactive"
+    return states
 
 
 def unit_last_line(name: str) -> str:
@@ -54,13 +73,70 @@ def unit_last_line(name: str) -> str:
         out = subprocess.check_output(
             ["journalctl", "--user", "-u", name, "-n", "1",
              "--no-pager", "-o", "short-iso"],
-            text=True, stderr=subprocess.DEVNULL
+            text=True, stderr=subprocess.DEVNULL, timeout=PROBE_TIMEOUT_S,
         ).strip().splitlines()
         return out[-1] if out else "no logs"
     except Exception:
         return "no logs"
 
 
+class CursorRejected(Exception):
+    """journalctl could not seek to the saved cursor (vacuumed or corrupt)."""
+
+
+def iter_journal(unit: str, cursor: str):
+    """
+    Yield (cursor, message) for each journal entry of a user unit after
+    `cursor`, or from the last 24 hours without one. Uses the sd-journal
+    bindings when installed, else streams `journalctl -o json`. Raises
+    CursorRejected when journalctl fails on `cursor` without output.
+    """
+    reader = None
+    if sd_journal is not None:
+        try:
+            reader = sd_journal.Reader(flags=sd_journal.CURRENT_USER)
+            reader.add_match(_SYSTEMD_USER_UNIT=unit)
+            if cursor:
+                reader.seek_cursor(cursor)
+            else:
+                reader.seek_realtime(datetime.now() - timedelta(hours=24))
+        except Exception:
+            reader = None
+    if reader is not None:
+        for entry in reader:
+            entry_cursor = entry.get("__CURSOR")
+            if entry_cursor == cursor:
+                continue  # seek_cursor lands on the already-processed entry
+            message = entry.get("MESSAGE", "")
+            if isinstance(message, bytes):
+                message = message.decode("utf-8", "replace")
+            yield entry_cursor, str(message)
+        return
+
+    cmd = [
+        "journalctl", "--user", "-u", unit,
+        "--no-pager", "-o", "json", "--output-fields=MESSAGE",
+    ]
+    cmd += [f"--after-cursor={cursor}"] if cursor else ["--since", "24 hours ago"]
+    seen = False
+    try:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+            for raw in proc.stdout:
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    continue
+                message = entry.get("MESSAGE")
+                if isinstance(message, list):  # non-UTF-8 messages come as byte arrays
+                    message = bytes(message).decode("utf-8", "replace")
+                seen = True
+                yield entry.get("__CURSOR"), message or ""
+    except OSError:
+        return
+    if cursor and not seen and proc.returncode:
+        raise CursorRejected(cursor)
+
+
 def rotate_log(path: str) -> None:
     p = Path(path)
     if p.exists() and p.stat().st_size > MAX_LOG_BYTES:
@@ -70,11 +146,13 @@ def rotate_log(path: str) -> None:
 
 # ── 1. Unit health ──────────────────────────────────────────
 
-units = {
-    "openclaw-gateway.service": unit_state("openclaw-gateway.service"),
-    "openclaw-ops-maintenance.timer": unit_state("openclaw-ops-maintenance.timer"),
-    "skill-scanner.timer": unit_state("skill-scanner.timer"),
-}
+UNITS = [
+    "openclaw-gateway.service",
+    "openclaw-ops-maintenance.timer",
+    "skill-scanner.timer",
+]
+
+units = unit_states(UNITS)
 
 
 # ── 2. Workspace invariants ─────────────────────────────────
@@ -136,37 +214,6 @@ for i in range(MEMORY_BACKFILL_DAYS):
 
 # ── 3. Incremental cooldown counters ────────────────────────
 
-journal_cmd = [
-    "journalctl", "--user", "-u", "openclaw-gateway.service",
-    "--no-pager", "-o", "short-iso",
-]
-if CURSOR_FILE.exists():
-    cursor_val = CURSOR_FILE.read_text().strip()
-    if cursor_val:
-        journal_cmd += [f"--after-cursor={cursor_val}"]
-else:
-    journal_cmd += ["--since", "24 hours ago"]
-
-try:
-    new_logs = subprocess.check_output(
-        journal_cmd, text=True, stderr=subprocess.DEVNULL
-    )
-except subprocess.CalledProcessError:
-    new_logs = ""
-
-try:
-    cursor_out = subprocess.check_output(
-        ["journalctl", "--user", "-u", "openclaw-gateway.service",
-         "-n", "1", "--show-cursor", "--no-pager", "-o", "short-iso"],
-        text=True, stderr=subprocess.DEVNULL
-    )
-    for line in cursor_out.splitlines():
-        if line.startswith("-- cursor:"):
-            CURSOR_FILE.write_text(line.replace("-- cursor:", "").strip())
-            break
-except Exception:
-    pass
-
 PATTERNS = {
     "embedded_timeout": "embedded run timeout",
     "cooldown_unavailable": "all in cooldown or unavailable",
@@ -176,44 +223,116 @@ PATTERNS = {
     "gateway_restart": "received SIGUSR1; restarting",
     "exec_command_blocked": "exec_command_blocked",
 }
+LANE_ERROR_MARKER = "[diagnostic] lane task error:"
+
+# One alternation over every pattern (plus the lane-error marker), so each
+# journal line is scanned once no matter how many counters there are.
+SCAN_RE = re.compile("|".join(
+    [f"(?P<{key}>{re.escape(pattern)})" for key, pattern in PATTERNS.items()]
+    + [f"(?P<lane_error>{re.escape(LANE_ERROR_MARKER)})"]
+))
 
-new_counts = {}
-for key, pattern in PATTERNS.items():
-    new_counts[key] = sum(1 for line in new_logs.splitlines() if pattern in line)
+cursor_val = CURSOR_FILE.read_text().strip() if CURSOR_FILE.exists() else ""
+
+new_counts = dict.fromkeys(PATTERNS, 0)
+lane_errors = Counter()
+
+# Entries are streamed, not buffered: after an error storm the first run can
+# cover 24h of journal. The saved cursor is the last entry actually counted,
+# so nothing written during the read is skipped next time.
+last_cursor = None
+try:
+    for entry_cursor, message in iter_journal("openclaw-gateway.service", cursor_val):
+        if entry_cursor:
+            last_cursor = entry_cursor
+        hits = {m.lastgroup for m in SCAN_RE.finditer(message)}
+        if not hits:
+            continue
+        for key in hits:
+            if key != "lane_error":
+                new_counts[key] += 1
+        if "lane_error" in hits and 'error="' in message:
+            start = message.find('error="') + len('error="')
+            end = message.find('"', start)
+            if end > start:
+                lane_errors[message[start:end]] += 1
+except CursorRejected:
+    # Keeping it would blind every later run; the next one reads the last 24h.
+    CURSOR_FILE.unlink(missing_ok=True)
+
+if last_cursor:
+    CURSOR_FILE.write_text(last_cursor)
+
+# Counters live in a fixed ring of COOLDOWN_BUCKETS five-minute buckets per
+# type: "head" is the newest bucket number (epoch seconds // bucket size) and
+# bucket b sits at counts[b % COOLDOWN_BUCKETS]. The state never grows and
+# every rolling window is a sum over at most COOLDOWN_BUCKETS slots.
+COOLDOWN_BUCKET_S = 300
+COOLDOWN_BUCKETS = 288
+COOLDOWN_WINDOWS = {"1h": 12, "6h": 72, "24h": 288}
 
 now_ts = time.time()
-cutoff = now_ts - 86400
+now_bucket = int(now_ts // COOLDOWN_BUCKET_S)
 
-if COOLDOWN_STATE.exists():
-    try:
-        state = json.loads(COOLDOWN_STATE.read_text())
-    except (json.JSONDecodeError, OSError):
-        state = {"events": []}
-else:
-    state = {"events": []}
 
-for key, count in new_counts.items():
-    if count > 0:
-        state["events"].append({"ts": now_ts, "type": key, "count": count})
+def advance_ring(ring: dict, bucket: int) -> None:
+    """Move the ring's head to `bucket`, zeroing the slots it passes."""
+    steps = bucket - ring["head"]
+    if steps <= 0:
+        return
+    counts = ring["counts"]
+    for b in range(ring["head"] + 1, ring["head"] + 1 + min(steps, COOLDOWN_BUCKETS)):
+        counts[b % COOLDOWN_BUCKETS] = 0
+    ring["head"] = bucket
+
 
-state["events"] = [e for e in state["events"] if e["ts"] > cutoff]
+def ring_sum(ring: dict, buckets: int) -> int:
+    counts = ring["counts"]
+    return sum(counts[b % COOLDOWN_BUCKETS] for b in range(ring["head"] - buckets + 1, ring["head"] + 1))
 
-rolling = {}
-for e in state["events"]:
-    rolling[e["type"]] = rolling.get(e["type"], 0) + e["count"]
-state["rolling"] = rolling
-state["last_update"] = now_ts
 
-COOLDOWN_STATE.write_text(json.dumps(state, indent=2), encoding="utf-8")
+try:
+    state = json.loads(COOLDOWN_STATE.read_text())
+except (json.JSONDecodeError, OSError):
+    state = {}
+
+rings = {}
+for key in PATTERNS:
+    ring = state.get("rings", {}).get(key)
+    if (
+        not isinstance(ring, dict)
+        or state.get("bucket_s") != COOLDOWN_BUCKET_S
+        or len(ring.get("counts", ())) != COOLDOWN_BUCKETS
+    ):
+        ring = {"head": now_bucket, "counts": [0] * COOLDOWN_BUCKETS}
+    rings[key] = ring
+    advance_ring(ring, now_bucket)
+
+# One-time migration from the old {"events": [{ts, type, count}]} list.
+for e in state.get("events", []):
+    age = now_bucket - int(e["ts"] // COOLDOWN_BUCKET_S)
+    if e.get("type") in rings and 0 <= age < COOLDOWN_BUCKETS:
+        rings[e["type"]]["counts"][(now_bucket - age) % COOLDOWN_BUCKETS] += e["count"]
+
+for key, count in new_counts.items():
+    rings[key]["counts"][now_bucket % COOLDOWN_BUCKETS] += count
+
+rolling_windows = {
+    window: {key: ring_sum(ring, buckets) for key, ring in rings.items()}
+    for window, buckets in COOLDOWN_WINDOWS.items()
+}
+rolling = rolling_windows["24h"]
+state = {
+    "bucket_s": COOLDOWN_BUCKET_S,
+    "rings": rings,
+    "rolling": rolling,
+    "rolling_windows": rolling_windows,
+    "last_update": now_ts,
+}
+
+COOLDOWN_STATE.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
 
-lane_errors = []
-for line in new_logs.splitlines():
-    if "[diagnostic] lane task error:" in line and 'error="' in line:
-        start = line.find('error="') + len('error="')
-        end = line.find('"', start)
-        if end > start:
-            lane_errors.append(line[start:end])
-top_errors = Counter(lane_errors).most_common(5)
+top_errors = lane_errors.most_common(5)
 
 health_status = "Stable" if rolling.get("cooldown_unavailable", 0) == 0 and rolling.get("embedded_timeout", 0) == 0 else "Degraded"
 
@@ -225,41 +344,105 @@ guard_result = "policy-only mode (runtime patch fallback retired)"
 
 # ── 5. Telegram routing metrics ───────────────────────────────
 
-telegram_metrics = {
-    "routes_total_24h": 0,
-    "vidar_to_main_24h": 0,
-    "others_to_isolated_24h": 0,
-    "invalid_sender_fallback_24h": 0,
-    "duplicate_message_id_24h": 0,
-}
-telegram_cutoff = datetime.now(timezone.utc) - timedelta(hours=24)
-
-if TELEGRAM_ROUTER_LOG.exists():
+# The log is tailed from a persisted inode + byte offset, and each routed
+# line lands in a per-minute ring of counters (one slot per minute of the
+# last 24h), so a run reads only bytes appended since the previous one. When
+# rotate_log() has renamed the file to .old since then, the rest of the old
+# inode is drained before the new file is read from the start.
+
+TELEGRAM_COUNTERS = (
+    "routes_total_24h",
+    "vidar_to_main_24h",
+    "others_to_isolated_24h",
+    "invalid_sender_fallback_24h",
+    "duplicate_message_id_24h",
+)
+RING_MINUTES = 24 * 60
+
+
+def read_new_lines(path: Path, offset: int):
+    """Return (complete lines after offset, offset just past the last one)."""
+    with path.open("rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    lines = data[:end].decode("utf-8", errors="ignore").splitlines()
+    return lines, offset + end
+
+
+def count_route(ring: list, line: str, oldest_minute: int) -> None:
+    if not line.startswith("[") or "]" not in line:
+        return
+    ts_end = line.find("]")
     try:
-        for line in TELEGRAM_ROUTER_LOG.read_text(encoding="utf-8", errors="ignore").splitlines():
-            if not line.startswith("[") or "]" not in line:
-                continue
-            ts_end = line.find("]")
-            try:
-                line_ts = datetime.fromisoformat(line[1:ts_end].replace("Z", "+00:00"))
-            except ValueError:
-                continue
-            if line_ts.tzinfo is None:
-                line_ts = line_ts.replace(tzinfo=timezone.utc)
-            if line_ts < telegram_cutoff:
-                continue
-
-            telegram_metrics["routes_total_24h"] += 1
-            if "agentId=main" in line and "sender=5309173712" in line:
-                telegram_metrics["vidar_to_main_24h"] += 1
-            if "agentId=telegram-isolated" in line and "sender=5309173712" not in line:
-                telegram_metrics["others_to_isolated_24h"] += 1
-            if "reason=invalid_sender" in line:
-                telegram_metrics["invalid_sender_fallback_24h"] += 1
-            if "reason=duplicate_message_id" in line:
-                telegram_metrics["duplicate_message_id_24h"] += 1
-    except Exception:
-        pass
+        line_ts = datetime.fromisoformat(line[1:ts_end].replace("Z", "+00:00"))
+    except ValueError:
+        return
+    if line_ts.tzinfo is None:
+        line_ts = line_ts.replace(tzinfo=timezone.utc)
+    minute = int(line_ts.timestamp() // 60)
+    if minute < oldest_minute:
+        return
+    slot = ring[minute % RING_MINUTES]
+    if slot is None or slot[0] < minute:
+        slot = ring[minute % RING_MINUTES] = [minute] + [0] * len(TELEGRAM_COUNTERS)
+    elif slot[0] > minute:
+        return  # a day older than the line already in this slot
+    slot[1] += 1
+    if "agentId=main" in line and "sender=5309173712" in line:
+        slot[2] += 1
+    if "agentId=telegram-isolated" in line and "sender=5309173712" not in line:
+        slot[3] += 1
+    if "reason=invalid_sender" in line:
+        slot[4] += 1
+    if "reason=duplicate_message_id" in line:
+        slot[5] += 1
+
+
+try:
+    telegram_state = json.loads(TELEGRAM_STATE.read_text(encoding="utf-8"))
+    if len(telegram_state["ring"]) != RING_MINUTES:
+        raise ValueError("ring size changed")
+except (OSError, ValueError, KeyError, TypeError):
+    telegram_state = {"ino": None, "offset": 0, "ring": [None] * RING_MINUTES}
+
+ring = telegram_state["ring"]
+now_minute = int(time.time() // 60)
+oldest_minute = now_minute - RING_MINUTES + 1
+
+try:
+    rotated = Path(str(TELEGRAM_ROUTER_LOG) + ".old")
+    ino, offset = telegram_state["ino"], telegram_state["offset"]
+    if ino is not None and rotated.exists() and rotated.stat().st_ino == ino:
+        if rotated.stat().st_size > offset:
+            for line in read_new_lines(rotated, offset)[0]:
+                count_route(ring, line, oldest_minute)
+        # Record the drain now: if reading the new file fails below, the next
+        # run must not count the .old lines again.
+        telegram_state["ino"], telegram_state["offset"] = ino, offset = None, 0
+    if TELEGRAM_ROUTER_LOG.exists():
+        st = TELEGRAM_ROUTER_LOG.stat()
+        if st.st_ino != ino or st.st_size < offset:
+            offset = 0  # a new or truncated file
+        lines, offset = read_new_lines(TELEGRAM_ROUTER_LOG, offset)
+        for line in lines:
+            count_route(ring, line, oldest_minute)
+        telegram_state["ino"], telegram_state["offset"] = st.st_ino, offset
+    else:
+        telegram_state["ino"], telegram_state["offset"] = None, 0
+except OSError:
+    pass
+
+telegram_metrics = dict.fromkeys(TELEGRAM_COUNTERS, 0)
+for slot in ring:
+    if slot is not None and slot[0] >= oldest_minute:
+        for i, key in enumerate(TELEGRAM_COUNTERS, 1):
+            telegram_metrics[key] += slot[i]
+
+try:
+    TELEGRAM_STATE.write_text(json.dumps(telegram_state, separators=(",", ":")), encoding="utf-8")
+except OSError:
+    pass
 
 # ── 5b. Telegram routing assertions ───────────────────────────
 
@@ -330,7 +513,15 @@ report_lines += [
     "## Cooldown Health (rolling 24h)",
 ]
 for key in PATTERNS:
-    report_lines.append(f"- {key}: {rolling.get(key, 0)}")
+    per_hour = {
+        window: rolling_windows[window][key] / (buckets * COOLDOWN_BUCKET_S / 3600)
+        for window, buckets in COOLDOWN_WINDOWS.items()
+    }
+    report_lines.append(
+        f"- {key}: {rolling.get(key, 0)} "
+        f"(1h: {rolling_windows['1h'][key]}, 6h: {rolling_windows['6h'][key]}; "
+        f"per hour 1h/6h/24h: {per_hour['1h']:.1f}/{per_hour['6h']:.1f}/{per_hour['24h']:.1f})"
+    )
 report_lines.append(f"- Overall: **{health_status}**")
 
 if top_errors: